@@ -146,12 +146,12 @@ class MetadataExtractor:
             )
             indexes.append(idx_info)
         
-        # Update unique constraints on columns
-        for idx in indexes:
-            if idx.is_unique and len(idx.columns) == 1:
-                for col in columns:
-                    if col.name == idx.columns[0]:
-                        col.is_unique = True
+        # Update unique constraints on columns (ColumnInfo is frozen, so copy)
+        unique_columns = {idx.columns[0] for idx in indexes if idx.is_unique and len(idx.columns) == 1}
+        columns = [
+            col.model_copy(update={"is_unique": True}) if col.name in unique_columns else col
+            for col in columns
+        ]
         
         # Get table comment
         table_comment = self._get_table_comment(engine, table_name, schema)
@@ -1,7 +1,8 @@
 """Metadata models for database schema representation."""
 
+from functools import cached_property
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -11,9 +12,23 @@ class RelationshipConfidence(str, Enum):
     MEDIUM = "medium"   # 80% - From naming convention
     LOW = "low"         # 60% - From similarity analysis
 
+    @property
+    def bit(self) -> int:
+        """Get the bit flag for mask filtering (LOW=1, MEDIUM=2, HIGH=4)."""
+        return _CONFIDENCE_BITS[self]
+
+
+_CONFIDENCE_BITS = {
+    RelationshipConfidence.LOW: 1,
+    RelationshipConfidence.MEDIUM: 2,
+    RelationshipConfidence.HIGH: 4,
+}
+
 
 class ColumnInfo(BaseModel):
     """Information about a database column."""
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Column name")
     data_type: str = Field(..., description="PostgreSQL data type")
     nullable: bool = Field(True, description="Whether the column allows NULL")
@@ -26,6 +41,8 @@ class ColumnInfo(BaseModel):
 
 class ForeignKeyInfo(BaseModel):
     """Information about a foreign key constraint."""
+    model_config = ConfigDict(frozen=True)
+
     constraint_name: str = Field(..., description="Name of the FK constraint")
     column: str = Field(..., description="Column in the current table")
     references_table: str = Field(..., description="Referenced table name")
@@ -43,6 +60,8 @@ class IndexInfo(BaseModel):
 
 class TableInfo(BaseModel):
     """Complete information about a database table."""
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Table name")
     schema_name: str = Field("public", description="Schema name")
     columns: list[ColumnInfo] = Field(default_factory=list, description="Table columns")
@@ -67,6 +86,8 @@ class TableInfo(BaseModel):
 
 class DetectedRelationship(BaseModel):
     """A detected relationship between two tables."""
+    model_config = ConfigDict(frozen=True)
+
     source_table: str = Field(..., description="Source table name")
     source_column: str = Field(..., description="Source column name")
     target_table: str = Field(..., description="Target table name")
@@ -75,6 +96,18 @@ class DetectedRelationship(BaseModel):
     detection_method: str = Field(..., description="How the relationship was detected")
     reason: str = Field(..., description="Explanation for this relationship")
 
+    @cached_property
+    def source_column_cf(self) -> str:
+        """Get the casefolded source column name (computed once, not serialized)."""
+        return self.source_column.casefold()
+
+    def model_copy(self, *, update=None, deep=False):
+        """Copy the relationship, dropping the cached casefold if fields change."""
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            copied.__dict__.pop("source_column_cf", None)
+        return copied
+
 
 class DatabaseMetadata(BaseModel):
     """Complete metadata for a database."""
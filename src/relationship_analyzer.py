@@ -1,6 +1,7 @@
 """Relationship analyzer for detecting table relationships."""
 
 import re
+from collections import deque
 from typing import Optional
 from difflib import SequenceMatcher
 import networkx as nx
@@ -14,6 +15,19 @@ from .models.metadata import (
 )
 
 
+# Common patterns for foreign key columns, tried left to right
+_FK_NAME_RE = re.compile(
+    r"^(?:"
+    r"(.+)_id"      # user_id -> user
+    r"|(.+)_fk"     # user_fk -> user
+    r"|(.+)Id"      # userId -> user
+    r"|fk_(.+)"     # fk_user -> user
+    r"|id_(.+)"     # id_user -> user
+    r")$",
+    re.IGNORECASE,
+)
+
+
 class RelationshipAnalyzer:
     """Analyzes database metadata to detect relationships between tables."""
 
@@ -26,6 +40,15 @@ class RelationshipAnalyzer:
         self.config = analysis_config or AnalysisConfig()
         self.relationship_graph = nx.DiGraph()
         
+        # source_table -> {target_table: (source_column, target_column)}, mirrors the graph edges
+        self._adjacency: dict[str, dict[str, tuple[str, str]]] = {}
+        
+        # (from_table, to_table) -> join path, reset whenever the graph is rebuilt
+        self._path_cache: dict[tuple[str, str], Optional[tuple[tuple[str, str, str, str], ...]]] = {}
+        
+        # Graph statistics, refreshed whenever the graph is rebuilt
+        self._stats = self._compute_stats()
+        
         # Default FK naming patterns
         self._fk_patterns = [
             re.compile(pattern) for pattern in self.config.fk_column_patterns
@@ -57,6 +80,10 @@ class RelationshipAnalyzer:
         similarity_relationships = self._detect_similarity_relationships(metadata, table_lookup, relationships)
         relationships.extend(similarity_relationships)
         
+        # Keep relationships ordered by descending confidence (stable, so
+        # detection order is preserved within each level)
+        relationships.sort(key=lambda r: -r.confidence.bit)
+        
         # Build relationship graph
         self._build_relationship_graph(relationships)
         
@@ -215,21 +242,12 @@ class RelationshipAnalyzer:
         Returns:
             Potential table name or None
         """
-        # Common patterns for foreign key columns
-        patterns = [
-            (r"^(.+)_id$", 1),           # user_id -> user
-            (r"^(.+)_fk$", 1),            # user_fk -> user
-            (r"^(.+)Id$", 1),             # userId -> user
-            (r"^fk_(.+)$", 1),            # fk_user -> user
-            (r"^id_(.+)$", 1),            # id_user -> user
-        ]
-        
-        for pattern, group in patterns:
-            match = re.match(pattern, column_name, re.IGNORECASE)
-            if match:
-                potential = match.group(group)
-                # Convert to common table name formats
-                return self._normalize_table_name(potential)
+        match = _FK_NAME_RE.match(column_name)
+        if match:
+            # Exactly one alternative participates in the match
+            potential = match.group(match.lastindex)
+            # Convert to common table name formats
+            return self._normalize_table_name(potential)
         
         return None
 
@@ -246,6 +264,8 @@ class RelationshipAnalyzer:
         name = re.sub(r'([a-z])([A-Z])', r'\1_\2', name).lower()
         
         # Handle pluralization (simple cases)
+        if len(name) > 1 and name.endswith('y') and name[-2] not in 'aeiou':
+            return name[:-1] + 'ies'  # category -> categories
         if not name.endswith('s'):
             return name + 's'  # user -> users
         return name
@@ -342,8 +362,15 @@ class RelationshipAnalyzer:
             relationships: List of detected relationships
         """
         self.relationship_graph.clear()
+        self._path_cache.clear()
+        self._adjacency = {}
         
         for rel in relationships:
+            # Later duplicates overwrite earlier ones, as add_edge does
+            self._adjacency.setdefault(rel.source_table, {})[rel.target_table] = (
+                rel.source_column,
+                rel.target_column,
+            )
             self.relationship_graph.add_edge(
                 rel.source_table,
                 rel.target_table,
@@ -352,8 +379,10 @@ class RelationshipAnalyzer:
                 confidence=rel.confidence.value,
                 method=rel.detection_method,
             )
+        
+        self._stats = self._compute_stats()
 
-    def get_join_path(self, from_table: str, to_table: str) -> Optional[list[tuple[str, str, str, str]]]:
+    def get_join_path(self, from_table: str, to_table: str) -> Optional[tuple[tuple[str, str, str, str], ...]]:
         """Find the shortest join path between two tables.
         
         Args:
@@ -361,29 +390,60 @@ class RelationshipAnalyzer:
             to_table: Target table name
             
         Returns:
-            List of (from_table, from_col, to_table, to_col) tuples or None
+            Tuple of (from_table, from_col, to_table, to_col) tuples or None
         """
-        try:
-            path = nx.shortest_path(self.relationship_graph, from_table, to_table)
-        except nx.NetworkXNoPath:
-            return None
+        key = (from_table, to_table)
+        if key not in self._path_cache:
+            self._path_cache[key] = self._compute_join_path(from_table, to_table)
+        
+        # Immutable, so the cached path is shared safely with callers
+        return self._path_cache[key]
+
+    def _compute_join_path(self, from_table: str, to_table: str) -> Optional[tuple[tuple[str, str, str, str], ...]]:
+        """Run a breadth-first search over the prebuilt adjacency.
         
-        if len(path) < 2:
+        Args:
+            from_table: Source table name
+            to_table: Target table name
+            
+        Returns:
+            Tuple of (from_table, from_col, to_table, to_col) tuples or None
+            
+        Raises:
+            nx.NodeNotFound: If either table has no relationships
+        """
+        for table in (from_table, to_table):
+            if table not in self.relationship_graph:
+                raise nx.NodeNotFound(f"Table {table} is not in the relationship graph")
+        
+        if from_table == to_table:
             return None
         
-        joins = []
-        for i in range(len(path) - 1):
-            edge_data = self.relationship_graph.get_edge_data(path[i], path[i + 1])
-            joins.append((
-                path[i],
-                edge_data['source_column'],
-                path[i + 1],
-                edge_data['target_column'],
-            ))
-        
-        return joins
+        # table -> join edge used to reach it
+        parents = {from_table: None}
+        queue = deque([from_table])
+        
+        while queue:
+            table = queue.popleft()
+            for target, (source_column, target_column) in self._adjacency.get(table, {}).items():
+                if target in parents:
+                    continue
+                
+                parents[target] = (table, source_column, target, target_column)
+                if target == to_table:
+                    # Walk the parent edges back to the start
+                    joins = []
+                    edge = parents[target]
+                    while edge is not None:
+                        joins.append(edge)
+                        edge = parents[edge[0]]
+                    return tuple(reversed(joins))
+                
+                queue.append(target)
+        
+        return None
 
-    def get_all_paths_from(self, table: str, max_depth: int = 3) -> dict[str, list[tuple]]:
+    def get_all_paths_from(self, table: str, max_depth: int = 3) -> dict[str, tuple[tuple, ...]]:
         """Get all join paths from a table up to max depth.
         
         Args:
@@ -408,6 +468,14 @@ class RelationshipAnalyzer:
     def get_relationship_stats(self) -> dict:
         """Get statistics about detected relationships.
         
+        Returns:
+            Statistics dictionary
+        """
+        return dict(self._stats)
+
+    def _compute_stats(self) -> dict:
+        """Compute statistics for the current relationship graph.
+        
         Returns:
             Statistics dictionary
         """
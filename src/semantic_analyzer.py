@@ -6,8 +6,25 @@ and columns to infer their business meaning.
 
 import os
 import json
-from typing import Dict, List, Any, Optional
+import math
+import asyncio
+import threading
+import functools
+import string
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+# 表分析请求的 system 角色设定
+_TABLE_ANALYSIS_PERSONA = "你是一个专业的数据分析师，擅长分析数据库结构并推断业务含义。"
 
 # 默认 Prompt 模板
 DEFAULT_TABLE_ANALYSIS_PROMPT = """你是一个数据分析专家。请分析以下数据库表信息，推断它在业务系统中代表的实体含义。
@@ -69,6 +86,198 @@ DEFAULT_RELATIONSHIP_ANALYSIS_PROMPT = """你是一个数据分析专家。请
 ```"""
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+# aiohttp 直连模式的重试退避参数（与 openai 客户端一致）
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 8.0
+_RETRY_AFTER_MAX = 60.0
+
+# 规则推断使用的映射表
+_TABLE_PREFIXES = ['raw_', 't_', 'tbl_', 'tb_', 'dim_', 'fact_', 'ods_', 'dwd_', 'dws_', 'ads_']
+
+_ENTITY_MAPPINGS = {
+    'user': '用户', 'users': '用户', 'account': '账户', 'accounts': '账户',
+    'order': '订单', 'orders': '订单', 'product': '产品', 'products': '产品',
+    'customer': '客户', 'customers': '客户', 'item': '项目', 'items': '项目',
+    'category': '类别', 'categories': '类别', 'department': '部门',
+    'employee': '员工', 'employees': '员工', 'staff': '员工',
+    'project': '项目', 'projects': '项目', 'task': '任务', 'tasks': '任务',
+    'log': '日志', 'logs': '日志', 'record': '记录', 'records': '记录',
+    'config': '配置', 'setting': '设置', 'settings': '设置',
+    'file': '文件', 'files': '文件', 'document': '文档', 'documents': '文档',
+    'message': '消息', 'messages': '消息', 'notification': '通知',
+    'payment': '支付', 'payments': '支付', 'transaction': '交易',
+    'inventory': '库存', 'stock': '库存', 'warehouse': '仓库',
+    'supplier': '供应商', 'vendor': '供应商', 'partner': '合作伙伴',
+    'contract': '合同', 'agreement': '协议',
+    'equipment': '设备', 'device': '设备', 'machine': '机器',
+    'defect': '缺陷', 'defects': '缺陷', 'issue': '问题', 'bug': '缺陷',
+    'work_order': '工单', 'workorder': '工单', 'ticket': '工单',
+    'listing': '列表项', 'listings': '列表项',
+    'district': '区域', 'area': '区域', 'region': '地区',
+}
+
+_COLUMN_MAPPINGS = {
+    'id': '标识', 'uuid': '唯一标识', 'code': '编码',
+    'name': '名称', 'title': '标题', 'label': '标签',
+    'description': '描述', 'desc': '描述', 'content': '内容', 'text': '文本',
+    'status': '状态', 'state': '状态', 'type': '类型', 'category': '类别',
+    'created_at': '创建时间', 'updated_at': '更新时间', 'deleted_at': '删除时间',
+    'create_time': '创建时间', 'update_time': '更新时间',
+    'start_time': '开始时间', 'end_time': '结束时间',
+    'price': '价格', 'amount': '金额', 'cost': '成本', 'total': '总计',
+    'quantity': '数量', 'qty': '数量', 'count': '数量',
+    'user_id': '用户ID', 'order_id': '订单ID', 'product_id': '产品ID',
+    'parent_id': '父级ID', 'level': '层级', 'sort': '排序',
+    'is_active': '是否激活', 'is_deleted': '是否删除', 'enabled': '是否启用',
+    'email': '邮箱', 'phone': '电话', 'mobile': '手机', 'address': '地址',
+    'remark': '备注', 'note': '备注', 'comment': '备注',
+    'version': '版本', 'priority': '优先级',
+}
+
+# 列名映射按插入顺序的排名，用于保持“先命中者优先”的语义
+_COLUMN_MAPPING_RANK = {eng: i for i, eng in enumerate(_COLUMN_MAPPINGS)}
+_COLUMN_MAPPING_VALUES = list(_COLUMN_MAPPINGS.values())
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_template(template: str) -> Optional[str]:
+    """Pre-parse a ``str.format`` template into an equivalent %-style template.
+    
+    Returns None when the template uses more than plain ``{name}`` fields
+    (format specs, conversions, attribute/index access or positional fields);
+    callers then fall back to ``str.format``.
+    """
+    parts = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        parts.append(literal.replace('%', '%%'))
+        if field_name is None:
+            continue
+        if format_spec or conversion or not field_name.isidentifier():
+            return None
+        parts.append(f"%({field_name})s")
+    return "".join(parts)
+
+
+def _render_template(template: str, fields: Dict[str, Any]) -> str:
+    """Render a prompt template, reusing its parsed form across calls."""
+    compiled = _compile_template(template)
+    if compiled is None:
+        return template.format(**fields)
+    return compiled % fields
+
+
+@functools.lru_cache(maxsize=32)
+def _split_template(template: str) -> Optional[Tuple[str, str]]:
+    """Split a prompt template into a static system prompt and a per-call payload.
+    
+    The payload is the run of paragraphs from the first to the last paragraph
+    containing a ``{field}``; the static paragraphs before and after it form the
+    system prompt, so every request built from the same template shares it.
+    Returns None when the template has no fields or no static text, or when
+    it cannot be parsed (callers then format it whole, raising as before).
+    """
+    lines = template.split("\n")
+    try:
+        field_lines = [
+            i for i, line in enumerate(lines)
+            if any(field is not None for _, field, _, _ in string.Formatter().parse(line))
+        ]
+    except ValueError:
+        return None
+    if not field_lines:
+        return None
+    
+    # 扩展到所在段落的边界，使标题行随占位符一起进入负载
+    start, end = field_lines[0], field_lines[-1] + 1
+    while start > 0 and lines[start - 1].strip():
+        start -= 1
+    while end < len(lines) and lines[end].strip():
+        end += 1
+    
+    static_parts = [
+        "\n".join(part).strip() for part in (lines[:start], lines[end:])
+    ]
+    system_prompt = "\n\n".join(p for p in static_parts if p)
+    if not system_prompt:
+        return None
+    # 静态部分不经过 format，需还原转义的花括号
+    try:
+        system_prompt = _render_template(system_prompt, {})
+    except (KeyError, IndexError, ValueError):
+        return None
+    return system_prompt, "\n".join(lines[start:end])
+
+
+def _floats_format_alike(value: Any) -> bool:
+    """Check that orjson would write every float in ``value`` exactly as json does.
+    
+    The two differ for NaN/Infinity (``null`` vs ``NaN``), exponent notation
+    (``1e16`` vs ``1e+16``) and float subclasses such as ``numpy.float64``
+    (``default=str`` vs a bare number); plain finite floats whose repr has
+    no exponent come out identical.
+    """
+    if isinstance(value, float):
+        return type(value) is float and math.isfinite(value) and "e" not in repr(value)
+    if isinstance(value, dict):
+        return all(_floats_format_alike(k) and _floats_format_alike(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return all(_floats_format_alike(v) for v in value)
+    return True
+
+
+def _dumps_sample(rows: List[Dict[str, Any]]) -> str:
+    """Serialize sample rows as compact JSON for the prompt (no indentation).
+    
+    The orjson path produces the same text as the json fallback: datetimes,
+    dataclasses and numpy values go through ``default=str`` in both, and rows
+    with floats the two would format differently use the fallback.
+    """
+    if orjson is not None and _floats_format_alike(rows):
+        try:
+            return orjson.dumps(
+                rows,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+            ).decode()
+        except TypeError:
+            # 例如超出 64 位的整数，交给标准库处理
+            pass
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retrying a failed request.
+    
+    A ``Retry-After`` header (seconds or HTTP date) is honored when it is
+    reasonable; otherwise exponential backoff with jitter is used.
+    """
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+                if when.tzinfo is None:
+                    when = when.replace(tzinfo=timezone.utc)
+                delay = (when - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = -1.0
+        if 0 <= delay <= _RETRY_AFTER_MAX:
+            return delay
+    return min(_RETRY_BASE_DELAY * 2 ** attempt, _RETRY_MAX_DELAY) * random.uniform(0.75, 1.0)
+
+
+def _format_column(col: Dict[str, Any]) -> str:
+    """Format one column line for the table analysis prompt."""
+    pk = " - PK" if col.get('is_primary_key') else ""
+    comment = f" - {col['comment']}" if col.get('comment') else ""
+    return f"- {col['name']} ({col['data_type']}){pk}{comment}"
+
+
 @dataclass
 class LLMConfig:
     """LLM configuration."""
@@ -78,6 +287,14 @@ class LLMConfig:
     model: str = "gpt-4o-mini"
     temperature: float = 0.3
     max_tokens: int = 2000
+    max_retries: int = 3  # 限流/5xx 的指数退避重试次数（openai 客户端与 aiohttp 直连共用）
+    
+    # 高并发模式：绕过 openai 客户端，直接用 aiohttp 请求 /chat/completions
+    high_concurrency: bool = False
+    max_concurrency: int = 16
+    
+    # 表名与大部分列名都能被规则映射覆盖时，跳过 LLM 调用
+    skip_llm_when_confident: bool = False
     
     # Prompt 模板
     table_analysis_prompt: str = DEFAULT_TABLE_ANALYSIS_PROMPT
@@ -90,6 +307,7 @@ class SemanticAnalyzer:
     def __init__(self, config: LLMConfig = None):
         self.config = config or LLMConfig()
         self._client = None
+        self._sessions: Dict[Any, Any] = {}  # event loop -> aiohttp.ClientSession
         
     def _get_client(self):
         """Get or create LLM client."""
@@ -104,7 +322,8 @@ class SemanticAnalyzer:
                     return None
                 self._client = OpenAI(
                     api_key=api_key,
-                    base_url=self.config.api_base or os.getenv("OPENAI_API_BASE")
+                    base_url=self.config.api_base or os.getenv("OPENAI_API_BASE"),
+                    max_retries=self.config.max_retries
                 )
             except ImportError:
                 return None
@@ -130,27 +349,176 @@ class SemanticAnalyzer:
         Returns:
             Analysis result dict or None if LLM not available
         """
+        if self.config.skip_llm_when_confident and self._is_confidently_rule_coverable(table_name, columns):
+            return self._rule_based_table_analysis(table_name, columns, sample_data)
+        
         client = self._get_client()
         if not client:
             # 返回基于规则的分析
             return self._rule_based_table_analysis(table_name, columns, sample_data)
         
+        messages = self._build_table_messages(
+            table_name, columns, sample_data, table_comment, row_count
+        )
+        
+        try:
+            response = client.chat.completions.create(
+                model=self.config.model,
+                messages=messages,
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_tokens
+            )
+            
+            result = self._parse_response(response.choices[0].message.content)
+            if result is not None:
+                return result
+                
+        except Exception as e:
+            print(f"LLM analysis failed: {e}")
+        
+        return self._rule_based_table_analysis(table_name, columns, sample_data)
+    
+    def analyze_many(
+        self,
+        jobs: List[Tuple[Any, ...]],
+        workers: int = 8
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Analyze several tables concurrently on a bounded thread pool.
+        
+        Args:
+            jobs: Positional argument tuples for analyze_table, each starting
+                with the table name
+            workers: Maximum number of concurrent LLM requests
+            
+        Returns:
+            Dict mapping table names to analysis results, in job order
+        """
+        # 在提交任务前创建客户端，避免多个线程同时初始化
+        self._get_client()
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(job[0], executor.submit(self.analyze_table, *job)) for job in jobs]
+            return {table_name: future.result() for table_name, future in futures}
+    
+    async def analyze_table_async(
+        self,
+        table_name: str,
+        columns: List[Dict[str, Any]],
+        sample_data: List[Dict[str, Any]] = None,
+        table_comment: str = None,
+        row_count: int = None
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of analyze_table.
+        
+        With ``config.high_concurrency`` enabled, requests are POSTed directly
+        to ``{api_base}/chat/completions`` over a shared aiohttp session;
+        otherwise the synchronous client runs in a worker thread.
+        """
+        if self.config.skip_llm_when_confident and self._is_confidently_rule_coverable(table_name, columns):
+            return self._rule_based_table_analysis(table_name, columns, sample_data)
+        
+        session = self._aiohttp_session() if self.config.high_concurrency else None
+        api_key = self.config.api_key or os.getenv("OPENAI_API_KEY")
+        if session is None or not api_key:
+            return await asyncio.to_thread(
+                self.analyze_table, table_name, columns, sample_data, table_comment, row_count
+            )
+        
+        messages = self._build_table_messages(
+            table_name, columns, sample_data, table_comment, row_count
+        )
+        api_base = self.config.api_base or os.getenv("OPENAI_API_BASE") or "https://api.openai.com/v1"
+        body = {
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+        }
+        
+        try:
+            data = await self._post_with_retry(
+                session,
+                f"{api_base.rstrip('/')}/chat/completions",
+                body,
+                {"Authorization": f"Bearer {api_key}"}
+            )
+            
+            result = self._parse_response(data["choices"][0]["message"]["content"])
+            if result is not None:
+                return result
+                
+        except Exception as e:
+            print(f"LLM analysis failed: {e}")
+        
+        return self._rule_based_table_analysis(table_name, columns, sample_data)
+    
+    async def _post_with_retry(self, session, url: str, body: Dict[str, Any], headers: Dict[str, str]):
+        """POST a chat completion request and return the decoded JSON body.
+        
+        Rate limits (429), server errors (5xx) and connection errors are
+        retried up to ``config.max_retries`` times, waiting for the server's
+        ``Retry-After`` when it sends one.
+        """
+        import aiohttp
+        
+        for attempt in range(self.config.max_retries + 1):
+            last_attempt = attempt == self.config.max_retries
+            retry_after = None
+            try:
+                async with session.post(url, json=body, headers=headers) as resp:
+                    if last_attempt or not (resp.status == 429 or resp.status >= 500):
+                        resp.raise_for_status()
+                        return await resp.json()
+                    retry_after = resp.headers.get("Retry-After")
+            except aiohttp.ClientConnectionError:
+                if last_attempt:
+                    raise
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+    
+    def _aiohttp_session(self):
+        """Get or create the aiohttp session for the running event loop."""
+        try:
+            import aiohttp
+        except ImportError:
+            return None
+        
+        # 释放已关闭事件循环上的会话（无法再 await close），避免持有死循环
+        for dead_loop in [l for l in self._sessions if l.is_closed()]:
+            del self._sessions[dead_loop]
+        
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.config.max_concurrency * 2)
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return session
+    
+    async def aclose(self):
+        """Close the aiohttp session bound to the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+    
+    def _build_table_messages(
+        self,
+        table_name: str,
+        columns: List[Dict[str, Any]],
+        sample_data: List[Dict[str, Any]] = None,
+        table_comment: str = None,
+        row_count: int = None
+    ) -> List[Dict[str, str]]:
+        """Build chat messages for the table analysis prompt."""
         # 构建列信息
-        columns_info = "\n".join([
-            f"- {col['name']} ({col['data_type']})"
-            + (f" - PK" if col.get('is_primary_key') else "")
-            + (f" - {col.get('comment')}" if col.get('comment') else "")
-            for col in columns
-        ])
+        columns_info = "\n".join(_format_column(col) for col in columns)
         
         # 构建样本数据
         sample_str = "无样本数据"
         if sample_data and len(sample_data) > 0:
             sample_rows = sample_data[:3]  # 最多3行
-            sample_str = json.dumps(sample_rows, ensure_ascii=False, indent=2, default=str)
+            sample_str = _dumps_sample(sample_rows)
         
-        # 填充 prompt
-        prompt = self.config.table_analysis_prompt.format(
+        fields = dict(
             table_name=table_name,
             table_comment=table_comment or "无",
             column_count=len(columns),
@@ -159,29 +527,30 @@ class SemanticAnalyzer:
             sample_data=sample_str
         )
         
-        try:
-            response = client.chat.completions.create(
-                model=self.config.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的数据分析师，擅长分析数据库结构并推断业务含义。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
-            
-            content = response.choices[0].message.content
-            
-            # 提取 JSON
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                return json.loads(content[json_start:json_end])
-                
-        except Exception as e:
-            print(f"LLM analysis failed: {e}")
+        # 模板中不含占位符的段落放在 system 中，只有表信息随请求变化
+        split = _split_template(self.config.table_analysis_prompt)
+        if split is not None:
+            system_prompt, payload_template = split
+            return [
+                {"role": "system", "content": f"{_TABLE_ANALYSIS_PERSONA}\n\n{system_prompt}"},
+                {"role": "user", "content": _render_template(payload_template, fields)}
+            ]
         
-        return self._rule_based_table_analysis(table_name, columns, sample_data)
+        # 无法拆分的模板：保持原有结构
+        prompt = _render_template(self.config.table_analysis_prompt, fields)
+        return [
+            {"role": "system", "content": _TABLE_ANALYSIS_PERSONA},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_response(self, content: str) -> Optional[Dict[str, Any]]:
+        """Extract the JSON object from an LLM response."""
+        # 提取 JSON（从第一个 '{' 起直接解码，无需切片复制）
+        json_start = content.find('{')
+        if json_start >= 0:
+            result, _ = _JSON_DECODER.raw_decode(content, json_start)
+            return result
+        return None
     
     def _rule_based_table_analysis(
         self,
@@ -193,20 +562,15 @@ class SemanticAnalyzer:
         # 基于表名推断实体名称
         entity_name = self._infer_entity_name(table_name)
         
-        # 分析每个列
+        # 分析每个列（名称与描述一次推断）
         properties = []
         for col in columns:
-            prop = {
+            business_name, business_description = self._infer_column_bundle(col)
+            properties.append({
                 "column_name": col["name"],
-                "business_name": self._infer_column_name(col["name"]),
-                "business_description": self._infer_column_description(
-                    col["name"], 
-                    col["data_type"],
-                    col.get("comment"),
-                    col.get("is_primary_key", False)
-                )
-            }
-            properties.append(prop)
+                "business_name": business_name,
+                "business_description": business_description
+            })
         
         return {
             "entity_name_cn": entity_name,
@@ -216,72 +580,72 @@ class SemanticAnalyzer:
     
     def _infer_entity_name(self, table_name: str) -> str:
         """Infer Chinese entity name from table name."""
+        entity_name = self._lookup_entity_mapping(table_name)
+        if entity_name is not None:
+            return entity_name
+        
+        # 默认使用表名
+        return table_name.replace('_', ' ').title()
+    
+    def _lookup_entity_mapping(self, table_name: str) -> Optional[str]:
+        """Return the mapped Chinese entity name, or None if no mapping matches."""
         name_lower = table_name.lower()
         
         # 移除常见前缀
-        prefixes = ['raw_', 't_', 'tbl_', 'tb_', 'dim_', 'fact_', 'ods_', 'dwd_', 'dws_', 'ads_']
-        for prefix in prefixes:
+        for prefix in _TABLE_PREFIXES:
             if name_lower.startswith(prefix):
                 name_lower = name_lower[len(prefix):]
                 break
         
-        # 常见实体名映射
-        entity_mappings = {
-            'user': '用户', 'users': '用户', 'account': '账户', 'accounts': '账户',
-            'order': '订单', 'orders': '订单', 'product': '产品', 'products': '产品',
-            'customer': '客户', 'customers': '客户', 'item': '项目', 'items': '项目',
-            'category': '类别', 'categories': '类别', 'department': '部门',
-            'employee': '员工', 'employees': '员工', 'staff': '员工',
-            'project': '项目', 'projects': '项目', 'task': '任务', 'tasks': '任务',
-            'log': '日志', 'logs': '日志', 'record': '记录', 'records': '记录',
-            'config': '配置', 'setting': '设置', 'settings': '设置',
-            'file': '文件', 'files': '文件', 'document': '文档', 'documents': '文档',
-            'message': '消息', 'messages': '消息', 'notification': '通知',
-            'payment': '支付', 'payments': '支付', 'transaction': '交易',
-            'inventory': '库存', 'stock': '库存', 'warehouse': '仓库',
-            'supplier': '供应商', 'vendor': '供应商', 'partner': '合作伙伴',
-            'contract': '合同', 'agreement': '协议',
-            'equipment': '设备', 'device': '设备', 'machine': '机器',
-            'defect': '缺陷', 'defects': '缺陷', 'issue': '问题', 'bug': '缺陷',
-            'work_order': '工单', 'workorder': '工单', 'ticket': '工单',
-            'listing': '列表项', 'listings': '列表项',
-            'district': '区域', 'area': '区域', 'region': '地区',
-        }
-        
-        for eng, chn in entity_mappings.items():
+        for eng, chn in _ENTITY_MAPPINGS.items():
             if eng in name_lower:
                 return chn
-        
-        # 默认使用表名
-        return table_name.replace('_', ' ').title()
+        return None
     
     def _infer_column_name(self, column_name: str) -> str:
         """Infer Chinese column name."""
-        name_lower = column_name.lower()
+        return self._match_column_name(column_name, column_name.lower())
+    
+    def _match_column_name(self, column_name: str, name_lower: str) -> str:
+        """Look up the column mapping for an already lower-cased column name."""
+        mapped = self._lookup_column_mapping(name_lower)
+        if mapped is not None:
+            return mapped
+        return column_name.replace('_', ' ').title()
+    
+    def _lookup_column_mapping(self, name_lower: str) -> Optional[str]:
+        """Return the mapped Chinese column name, or None if no mapping matches."""
+        # 候选键：完整列名及每个 '_' 之后的后缀；取映射表中最靠前的命中项
+        best = _COLUMN_MAPPING_RANK.get(name_lower)
+        pos = name_lower.find('_')
+        while pos >= 0:
+            rank = _COLUMN_MAPPING_RANK.get(name_lower[pos + 1:])
+            if rank is not None and (best is None or rank < best):
+                best = rank
+            pos = name_lower.find('_', pos + 1)
         
-        column_mappings = {
-            'id': '标识', 'uuid': '唯一标识', 'code': '编码',
-            'name': '名称', 'title': '标题', 'label': '标签',
-            'description': '描述', 'desc': '描述', 'content': '内容', 'text': '文本',
-            'status': '状态', 'state': '状态', 'type': '类型', 'category': '类别',
-            'created_at': '创建时间', 'updated_at': '更新时间', 'deleted_at': '删除时间',
-            'create_time': '创建时间', 'update_time': '更新时间',
-            'start_time': '开始时间', 'end_time': '结束时间',
-            'price': '价格', 'amount': '金额', 'cost': '成本', 'total': '总计',
-            'quantity': '数量', 'qty': '数量', 'count': '数量',
-            'user_id': '用户ID', 'order_id': '订单ID', 'product_id': '产品ID',
-            'parent_id': '父级ID', 'level': '层级', 'sort': '排序',
-            'is_active': '是否激活', 'is_deleted': '是否删除', 'enabled': '是否启用',
-            'email': '邮箱', 'phone': '电话', 'mobile': '手机', 'address': '地址',
-            'remark': '备注', 'note': '备注', 'comment': '备注',
-            'version': '版本', 'priority': '优先级',
-        }
+        if best is not None:
+            return _COLUMN_MAPPING_VALUES[best]
+        return None
+    
+    def _is_confidently_rule_coverable(
+        self,
+        table_name: str,
+        columns: List[Dict[str, Any]]
+    ) -> bool:
+        """Check whether rule-based analysis covers a table well enough to skip the LLM.
         
-        for eng, chn in column_mappings.items():
-            if eng == name_lower or name_lower.endswith(f'_{eng}'):
-                return chn
+        True when the table name hits the entity mapping and at least 80% of
+        its columns hit the column mapping.
+        """
+        if not columns or self._lookup_entity_mapping(table_name) is None:
+            return False
         
-        return column_name.replace('_', ' ').title()
+        hits = sum(
+            1 for col in columns
+            if self._lookup_column_mapping(col["name"].lower()) is not None
+        )
+        return hits >= 0.8 * len(columns)
     
     def _infer_column_description(
         self,
@@ -295,7 +659,34 @@ class SemanticAnalyzer:
             return comment
         
         name_lower = column_name.lower()
+        return self._describe_column(
+            name_lower, data_type, is_primary_key,
+            self._match_column_name(column_name, name_lower)
+        )
+    
+    def _infer_column_bundle(self, col: Dict[str, Any]) -> Tuple[str, str]:
+        """Infer (business_name, business_description) for a column in one pass."""
+        column_name = col["name"]
+        name_lower = column_name.lower()
+        business_name = self._match_column_name(column_name, name_lower)
+        
+        comment = col.get("comment")
+        if comment:
+            return business_name, comment
         
+        description = self._describe_column(
+            name_lower, col["data_type"], col.get("is_primary_key", False), business_name
+        )
+        return business_name, description
+    
+    def _describe_column(
+        self,
+        name_lower: str,
+        data_type: str,
+        is_primary_key: bool,
+        business_name: str
+    ) -> str:
+        """Describe a column from its lower-cased name and type."""
         # 基于列名模式推断
         if is_primary_key or name_lower == 'id':
             return "记录的唯一标识符"
@@ -330,7 +721,7 @@ class SemanticAnalyzer:
         if 'json' in type_lower:
             return "结构化数据"
         
-        return f"{self._infer_column_name(column_name)}字段"
+        return f"{business_name}字段"
 
 
 def generate_semantic_report(
@@ -348,35 +739,46 @@ def generate_semantic_report(
     Returns:
         Markdown formatted report
     """
-    report = "# 本体语义分析报告\n\n"
+    out: List[str] = []
+    w = out.append
+    
+    total_props = sum(len(obj.properties) for obj in ontology.object_types)
+    
+    w("# 本体语义分析报告\n\n")
     
     # 摘要
-    report += "## 📊 概览\n\n"
-    report += f"| 指标 | 数量 |\n"
-    report += f"|------|------|\n"
-    report += f"| 业务实体 | {ontology.object_type_count} |\n"
-    report += f"| 实体关系 | {ontology.link_type_count} |\n"
-    report += f"| 总属性数 | {sum(len(obj.properties) for obj in ontology.object_types)} |\n\n"
+    w("## 📊 概览\n\n")
+    w("| 指标 | 数量 |\n")
+    w("|------|------|\n")
+    w(f"| 业务实体 | {ontology.object_type_count} |\n")
+    w(f"| 实体关系 | {ontology.link_type_count} |\n")
+    w(f"| 总属性数 | {total_props} |\n\n")
     
     # 实体分析
-    report += "## 🏢 业务实体\n\n"
+    w("## 🏢 业务实体\n\n")
+    
+    # 预先构建 表名 -> {列名: 属性分析} 索引，避免在循环内重复构建
+    prop_indexes = {
+        t: {p["column_name"]: p for p in a.get("properties", [])}
+        for t, a in table_analyses.items()
+    }
     
     for obj in ontology.object_types:
-        table_name = obj.source_table.split('.')[-1] if '.' in obj.source_table else obj.source_table
+        table_name = obj.source_table.rpartition('.')[2] or obj.source_table
         analysis = table_analyses.get(table_name, {})
         
         entity_name = analysis.get("entity_name_cn", obj.name)
         entity_desc = analysis.get("entity_description", obj.description)
         
-        report += f"### {entity_name} ({obj.name})\n\n"
-        report += f"**业务描述**: {entity_desc}\n\n"
-        report += f"**数据来源**: `{obj.source_table}`\n\n"
+        w(f"### {entity_name} ({obj.name})\n\n")
+        w(f"**业务描述**: {entity_desc}\n\n")
+        w(f"**数据来源**: `{obj.source_table}`\n\n")
         
         # 属性表格
-        report += "| 属性 | 业务名称 | 类型 | 说明 |\n"
-        report += "|------|---------|------|------|\n"
+        w("| 属性 | 业务名称 | 类型 | 说明 |\n")
+        w("|------|---------|------|------|\n")
         
-        prop_analyses = {p["column_name"]: p for p in analysis.get("properties", [])}
+        prop_analyses = prop_indexes.get(table_name, {})
         
         for prop in obj.properties:
             col_name = prop.source_column or prop.name
@@ -385,32 +787,38 @@ def generate_semantic_report(
             business_desc = prop_info.get("business_description", prop.description)
             pk_mark = " 🔑" if prop.is_primary_key else ""
             
-            report += f"| {prop.name}{pk_mark} | {business_name} | {prop.data_type} | {business_desc} |\n"
+            w(f"| {prop.name}{pk_mark} | {business_name} | {prop.data_type} | {business_desc} |\n")
         
-        report += "\n"
+        w("\n")
     
     # 关系分析
     if ontology.link_types:
-        report += "## 🔗 实体关系\n\n"
+        w("## 🔗 实体关系\n\n")
+        
+        rel_analyses = relationship_analyses or {}
         
         for link in ontology.link_types:
             rel_key = f"{link.source_object_type}-{link.target_object_type}"
-            rel_analysis = (relationship_analyses or {}).get(rel_key, {})
+            rel_analysis = rel_analyses.get(rel_key, {})
             
             rel_name = rel_analysis.get("relationship_name_cn", link.name)
             rel_desc = rel_analysis.get("relationship_description", link.description)
             
-            report += f"- **{link.source_object_type}** → *{rel_name}* → **{link.target_object_type}**\n"
-            report += f"  - {rel_desc}\n"
+            w(f"- **{link.source_object_type}** → *{rel_name}* → **{link.target_object_type}**\n")
+            w(f"  - {rel_desc}\n")
         
-        report += "\n"
+        w("\n")
     
-    return report
+    return "".join(out)
 
 
 # 配置文件路径
 PROMPTS_CONFIG_PATH = None
 
+# (配置路径, 文件 mtime, 解析结果)
+_PROMPTS_CACHE: Tuple[Optional[str], Optional[float], Optional[Dict[str, str]]] = (None, None, None)
+_PROMPTS_CACHE_LOCK = threading.Lock()
+
 
 def get_prompts_config_path() -> str:
     """Get the path to prompts config file."""
@@ -426,23 +834,46 @@ def get_prompts_config_path() -> str:
 
 
 def load_prompts_config() -> Dict[str, str]:
-    """Load prompts configuration from file."""
+    """Load prompts configuration from file.
+    
+    The parsed file is cached in-process and re-read only when its mtime changes.
+    """
+    global _PROMPTS_CACHE
     config_path = get_prompts_config_path()
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
+    try:
+        mtime = os.path.getmtime(config_path)
+    except OSError:
+        mtime = None
     
-    return {
-        "table_analysis_prompt": DEFAULT_TABLE_ANALYSIS_PROMPT,
-        "relationship_analysis_prompt": DEFAULT_RELATIONSHIP_ANALYSIS_PROMPT
-    }
+    with _PROMPTS_CACHE_LOCK:
+        cached_path, cached_mtime, cached = _PROMPTS_CACHE
+        if cached is not None and cached_path == config_path and cached_mtime == mtime:
+            return dict(cached)
+        
+        result = None
+        if mtime is not None:
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+            except:
+                pass
+        
+        if result is None:
+            result = {
+                "table_analysis_prompt": DEFAULT_TABLE_ANALYSIS_PROMPT,
+                "relationship_analysis_prompt": DEFAULT_RELATIONSHIP_ANALYSIS_PROMPT
+            }
+        
+        _PROMPTS_CACHE = (config_path, mtime, result)
+        return dict(result)
 
 
 def save_prompts_config(config: Dict[str, str]):
     """Save prompts configuration to file."""
+    global _PROMPTS_CACHE
     config_path = get_prompts_config_path()
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, ensure_ascii=False, indent=2)
+    with _PROMPTS_CACHE_LOCK:
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+        # mtime 精度可能不足以区分快速连续的写入，保存时直接失效缓存
+        _PROMPTS_CACHE = (None, None, None)
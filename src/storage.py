@@ -3,14 +3,38 @@
 import json
 import sqlite3
 import os
+import threading
+import functools
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import base64
 import hashlib
 
 
+# AES-GCM 密文前缀；无前缀的旧数据按 Fernet 解密
+_V2_PREFIX = "v2:"
+
+
+@functools.cache
+def _get_cipher(key_path: str) -> Tuple[bytes, Fernet, AESGCM]:
+    """Load (or create) the key file once per process and build the ciphers."""
+    path = Path(key_path)
+    if path.exists():
+        with open(path, "rb") as f:
+            key = f.read()
+    else:
+        key = Fernet.generate_key()
+        with open(path, "wb") as f:
+            f.write(key)
+    
+    # 从 Fernet 密钥派生独立的 256 位 AES-GCM 密钥
+    aead_key = hashlib.sha256(b"data2ontology-aesgcm:" + base64.urlsafe_b64decode(key)).digest()
+    return key, Fernet(key), AESGCM(aead_key)
+
+
 class ConnectionStorage:
     """SQLite-based storage for database connections."""
     
@@ -24,85 +48,103 @@ class ConnectionStorage:
             db_path = str(app_dir / "connections.db")
         
         self.db_path = db_path
+        
+        # 复用单个连接（autocommit 模式），通过锁在多线程间共享
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        
         self._init_db()
         self._init_encryption()
     
+    def close(self):
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
     def _init_db(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS connections (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                db_type TEXT NOT NULL,
-                host TEXT,
-                port INTEGER,
-                database TEXT,
-                username TEXT,
-                password_encrypted TEXT,
-                schema_name TEXT,
-                file_path TEXT,
-                status TEXT DEFAULT 'disconnected',
-                created_at TEXT,
-                updated_at TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS neo4j_connections (
-                id TEXT PRIMARY KEY,
-                uri TEXT NOT NULL,
-                username TEXT,
-                password_encrypted TEXT,
-                status TEXT DEFAULT 'disconnected',
-                created_at TEXT
+        with self._lock:
+            # 旧版数据库（DELETE 日志模式）首次切换到 WAL 时整理一次文件
+            journal_mode = self._conn.execute("PRAGMA journal_mode").fetchone()[0]
+            has_schema = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'connections'"
+            ).fetchone()
+            if journal_mode.lower() == "delete" and has_schema:
+                self._conn.execute("VACUUM")
+            
+            # 读多写少：WAL 让读写互不阻塞，mmap 减少读路径的内存拷贝
+            self._conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA mmap_size=67108864;
+                PRAGMA temp_store=MEMORY;
+            """)
+            
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS connections (
+                    id TEXT PRIMARY KEY,
+                    name TEXT,
+                    db_type TEXT NOT NULL,
+                    host TEXT,
+                    port INTEGER,
+                    database TEXT,
+                    username TEXT,
+                    password_encrypted TEXT,
+                    schema_name TEXT,
+                    file_path TEXT,
+                    status TEXT DEFAULT 'disconnected',
+                    created_at TEXT,
+                    updated_at TEXT
+                )
+            """)
+            
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_connections_updated_at ON connections(updated_at DESC)"
             )
-        """)
-        
-        conn.commit()
-        conn.close()
+            
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS neo4j_connections (
+                    id TEXT PRIMARY KEY,
+                    uri TEXT NOT NULL,
+                    username TEXT,
+                    password_encrypted TEXT,
+                    status TEXT DEFAULT 'disconnected',
+                    created_at TEXT
+                )
+            """)
     
     def _init_encryption(self):
         """Initialize encryption key."""
         key_path = Path(self.db_path).parent / ".key"
-        if key_path.exists():
-            with open(key_path, "rb") as f:
-                self.key = f.read()
-        else:
-            self.key = Fernet.generate_key()
-            with open(key_path, "wb") as f:
-                f.write(self.key)
-        self.cipher = Fernet(self.key)
+        self.key, self.cipher, self._aead = _get_cipher(str(key_path))
     
     def _encrypt(self, text: str) -> str:
         """Encrypt sensitive data."""
         if not text:
             return ""
-        return self.cipher.encrypt(text.encode()).decode()
+        nonce = os.urandom(12)
+        token = self._aead.encrypt(nonce, text.encode(), None)
+        return _V2_PREFIX + base64.b64encode(nonce + token).decode()
     
     def _decrypt(self, encrypted: str) -> str:
         """Decrypt sensitive data."""
         if not encrypted:
             return ""
+        if encrypted.startswith(_V2_PREFIX):
+            raw = base64.b64decode(encrypted[len(_V2_PREFIX):])
+            return self._aead.decrypt(raw[:12], raw[12:], None).decode()
+        # 旧版 Fernet 密文
         return self.cipher.decrypt(encrypted.encode()).decode()
     
-    def save_connection(self, connection: Dict[str, Any]) -> str:
-        """Save a new connection or update existing."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def _connection_row(self, connection: Dict[str, Any]) -> tuple:
+        """Build the parameter tuple for a connections table row."""
         connection_id = connection.get("id") or f"conn_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
         now = datetime.now().isoformat()
         
-        password_encrypted = self._encrypt(connection.get("password", ""))
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO connections 
-            (id, name, db_type, host, port, database, username, password_encrypted, schema_name, file_path, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        return (
             connection_id,
             connection.get("name", connection.get("database", "Unnamed")),
             connection.get("db_type", "postgresql"),
@@ -110,40 +152,60 @@ class ConnectionStorage:
             connection.get("port"),
             connection.get("database"),
             connection.get("user") or connection.get("username"),
-            password_encrypted,
+            self._encrypt(connection.get("password", "")),
             connection.get("schema_name"),
             connection.get("file_path"),
             connection.get("status", "disconnected"),
             connection.get("created_at", now),
             now
-        ))
+        )
+    
+    _UPSERT_CONNECTION_SQL = """
+        INSERT OR REPLACE INTO connections
+        (id, name, db_type, host, port, database, username, password_encrypted, schema_name, file_path, status, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    def save_connection(self, connection: Dict[str, Any]) -> str:
+        """Save a new connection or update existing."""
+        row = self._connection_row(connection)
         
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(self._UPSERT_CONNECTION_SQL, row)
         
-        return connection_id
+        return row[0]
+    
+    def save_connections(self, connections: List[Dict[str, Any]]) -> List[str]:
+        """Save multiple connections atomically in a single transaction."""
+        # 加密在事务外逐行完成，I/O 则合并为一次提交
+        rows = [self._connection_row(c) for c in connections]
+        
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._UPSERT_CONNECTION_SQL, rows)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        
+        return [row[0] for row in rows]
     
     def get_all_connections(self) -> List[Dict[str, Any]]:
         """Get all saved connections (without decrypted passwords)."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM connections ORDER BY updated_at DESC")
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT id, name, db_type, host, port, database, username, schema_name, file_path,
+                       status, created_at, updated_at
+                FROM connections ORDER BY updated_at DESC
+            """).fetchall()
         
         return [dict(row) for row in rows]
     
     def get_connection(self, connection_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific connection with decrypted password."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM connections WHERE id = ?", (connection_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM connections WHERE id = ?", (connection_id,)).fetchone()
         
         if row:
             result = dict(row)
@@ -156,65 +218,48 @@ class ConnectionStorage:
     
     def update_status(self, connection_id: str, status: str):
         """Update connection status."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "UPDATE connections SET status = ?, updated_at = ? WHERE id = ?",
-            (status, datetime.now().isoformat(), connection_id)
-        )
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE connections SET status = ?, updated_at = ? WHERE id = ?",
+                (status, datetime.now().isoformat(), connection_id)
+            )
     
     def delete_connection(self, connection_id: str):
         """Delete a connection."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM connections WHERE id = ?", (connection_id,))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute("DELETE FROM connections WHERE id = ?", (connection_id,))
     
     # Neo4j connection methods
     def save_neo4j_connection(self, connection: Dict[str, Any]) -> str:
         """Save Neo4j connection."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         connection_id = "neo4j_default"
         now = datetime.now().isoformat()
         
         password_encrypted = self._encrypt(connection.get("password", ""))
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO neo4j_connections 
-            (id, uri, username, password_encrypted, status, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            connection_id,
-            connection.get("uri"),
-            connection.get("user") or connection.get("username"),
-            password_encrypted,
-            connection.get("status", "disconnected"),
-            now
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO neo4j_connections
+                (id, uri, username, password_encrypted, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                connection_id,
+                connection.get("uri"),
+                connection.get("user") or connection.get("username"),
+                password_encrypted,
+                connection.get("status", "disconnected"),
+                now
+            ))
         
         return connection_id
     
     def get_neo4j_connection(self) -> Optional[Dict[str, Any]]:
         """Get Neo4j connection with decrypted password."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM neo4j_connections WHERE id = 'neo4j_default'")
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT id, uri, username, password_encrypted, status, created_at
+                FROM neo4j_connections WHERE id = 'neo4j_default'
+            """).fetchone()
         
         if row:
             result = dict(row)
@@ -1,8 +1,14 @@
 """Unstructured data analyzer - integrates insights from logs and code with metadata."""
 
+import functools
+import re
+import sys
+from bisect import bisect_left, bisect_right
 from typing import Optional
 from collections import defaultdict
-from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from rapidfuzz import fuzz, process
 
 from .models.metadata import (
     DatabaseMetadata,
@@ -17,6 +23,62 @@ from .log_analyzer import LogAnalyzer, analyze_logs
 from .code_analyzer import CodeAnalyzer, analyze_code
 
 
+# Suffixes in string order; "(?<=.)" keeps at least one leading character
+_SUFFIX_RE = re.compile(r"(?<=.)s*(?:_dto)?(?:_table)?(?:_model)?(?:_entity)?$")
+
+# Relationship confidence level -> numeric score
+_CONFIDENCE_MAP = {
+    "high": 1.0,
+    "medium": 0.8,
+    "low": 0.6
+}
+
+
+def _pair_key(source: str, target: str) -> str:
+    """Build an interned dict key for a (source, target) entity pair.
+    
+    Normalized names never contain NUL, so the pair splits back unambiguously.
+    """
+    return sys.intern(source + "\0" + target)
+
+
+def _best_matches(scores: np.ndarray, cutoff: float, columns: np.ndarray) -> np.ndarray:
+    """Pick the best-scoring column of each row of a cdist score matrix.
+    
+    Args:
+        scores: (entities x tables) matrix from rapidfuzz.process.cdist
+        cutoff: Score cutoff passed to cdist (scores below it come back as 0)
+        columns: Table index of each score column; ties go to the lowest
+        
+    Returns:
+        Table index per row, or -1 where no score passed the cutoff
+    """
+    best_scores = scores.max(axis=1)
+    tied = scores == best_scores[:, None]
+    best = np.where(tied, columns, np.iinfo(np.intp).max).min(axis=1)
+    if cutoff <= 0:
+        return best
+    return np.where(best_scores > 0, best, -1)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    """Normalize entity name for comparison.
+    
+    Results are memoized: the same table and entity names recur across
+    entity matching, relationship building and cooccurrence lists.
+    
+    Args:
+        name: Entity name
+        
+    Returns:
+        Normalized name
+    """
+    # Lowercase, then strip "_entity", "_model", "_table", "_dto" (each at most
+    # once, innermost-last) followed by any trailing plural "s" characters
+    return _SUFFIX_RE.sub("", name.lower()).strip("_")
+
+
 class UnstructuredAnalyzer:
     """Integrates insights from logs, code, and database metadata."""
 
@@ -50,19 +112,25 @@ class UnstructuredAnalyzer:
         Returns:
             EnhancedDatabaseMetadata with integrated insights
         """
-        # Analyze logs if paths provided
-        log_insights = None
-        if log_paths:
-            log_insights = analyze_logs(log_paths, max_lines=log_max_lines)
-        
-        # Analyze code if paths provided
-        code_insights = None
-        if code_paths:
-            code_insights = analyze_code(
-                code_paths,
-                languages=code_languages,
-                exclude_patterns=code_exclude_patterns
-            )
+        # Logs and code are independent, so read and parse them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Analyze logs if paths provided
+            log_future = None
+            if log_paths:
+                log_future = executor.submit(analyze_logs, log_paths, max_lines=log_max_lines)
+            
+            # Analyze code if paths provided
+            code_future = None
+            if code_paths:
+                code_future = executor.submit(
+                    analyze_code,
+                    code_paths,
+                    languages=code_languages,
+                    exclude_patterns=code_exclude_patterns
+                )
+            
+            log_insights = log_future.result() if log_future else None
+            code_insights = code_future.result() if code_future else None
         
         # Create enhanced metadata
         enhanced = EnhancedDatabaseMetadata(
@@ -73,23 +141,59 @@ class UnstructuredAnalyzer:
             code_insights=code_insights,
         )
         
+        # Walk log cooccurrences once for both entity and relationship insights
+        log_related, log_pairs = self._collect_cooccurrences(log_insights)
+        
+        # Normalize every table name once for all entity lookups
+        norm_tables = [(self._normalize_name(table.name), table) for table in metadata.tables]
+        
         # Generate entity insights by combining all sources
         enhanced.entity_insights = self._generate_entity_insights(
-            metadata, log_insights, code_insights
+            metadata, log_insights, code_insights, log_related, norm_tables
         )
         
         # Generate relationship insights
         enhanced.relationship_insights = self._generate_relationship_insights(
-            metadata, log_insights, code_insights
+            metadata, code_insights, log_pairs
         )
         
         return enhanced
 
+    def _collect_cooccurrences(
+        self,
+        log_insights: Optional[LogInsight],
+    ) -> tuple[dict[str, set[str]], dict[str, list[str]]]:
+        """Normalize log cooccurrences in a single pass.
+        
+        Args:
+            log_insights: Insights from logs
+            
+        Returns:
+            Tuple of (raw entity -> normalized related names,
+            pair key -> cooccurrence evidence in encounter order)
+        """
+        log_related = {}
+        log_pairs = defaultdict(list)
+        if not log_insights:
+            return log_related, log_pairs
+        
+        for entity, related_list in log_insights.entity_cooccurrences.items():
+            source = self._normalize_name(entity)
+            related_norms = [self._normalize_name(r) for r in related_list]
+            log_related[entity] = set(related_norms)
+            
+            for target, related in zip(related_norms, related_list):
+                log_pairs[_pair_key(source, target)].append(f"在日志中经常同时出现 {entity} 和 {related}")
+        
+        return log_related, log_pairs
+
     def _generate_entity_insights(
         self,
         metadata: DatabaseMetadata,
         log_insights: Optional[LogInsight],
         code_insights: Optional[CodeInsight],
+        log_related: dict[str, set[str]],
+        norm_tables: list,
     ) -> list[EntityInsight]:
         """Generate combined entity insights from all sources.
         
@@ -97,6 +201,8 @@ class UnstructuredAnalyzer:
             metadata: Database metadata
             log_insights: Insights from logs
             code_insights: Insights from code
+            log_related: Normalized cooccurring entities per raw log entity
+            norm_tables: List of (normalized name, TableInfo) pairs
             
         Returns:
             List of EntityInsight objects
@@ -106,10 +212,12 @@ class UnstructuredAnalyzer:
         # Map: entity_name -> EntityInsight
         entity_map = {}
         
+        # Map: entity_name -> related entity names, deduplicated on insert
+        related_sets = defaultdict(set)
+        
         # Add entities from database tables
-        for table in metadata.tables:
-            entity_name = self._normalize_name(table.name)
-            insight = EntityInsight(
+        for entity_name, table in norm_tables:
+            insight = EntityInsight.model_construct(
                 entity_name=entity_name,
                 table_name=table.name,
                 sources=[InsightSource.METADATA],
@@ -117,13 +225,42 @@ class UnstructuredAnalyzer:
             )
             entity_map[entity_name] = insight
         
+        # Get entity statistics from logs, laid out as parallel arrays
+        # indexed by each entity's position in entity_ids
+        entity_ids: dict[str, int] = {}
+        entity_operations: list[set] = []
+        entity_related: list[set] = []
+        if log_insights:
+            # Collect operations
+            for pattern in log_insights.operation_patterns:
+                for entity in pattern.entities_involved:
+                    i = entity_ids.setdefault(entity, len(entity_ids))
+                    if i == len(entity_operations):
+                        entity_operations.append(set())
+                        entity_related.append(set())
+                    entity_operations[i].add(pattern.operation_type)
+            
+            # Collect cooccurrences (already normalized)
+            for entity, related in log_related.items():
+                i = entity_ids.setdefault(entity, len(entity_ids))
+                if i == len(entity_operations):
+                    entity_operations.append(set())
+                    entity_related.append(set())
+                entity_related[i].update(related)
+        
+        # Match all code and log entities against tables in one batch
+        candidates = list(entity_ids)
+        if code_insights:
+            candidates.extend(code_entity.name for code_entity in code_insights.entities)
+        table_matches = self._match_tables(candidates, norm_tables)
+        
         # Integrate code insights
         if code_insights:
             for code_entity in code_insights.entities:
                 entity_name = self._normalize_name(code_entity.name)
                 
                 # Try to match with existing table
-                matched_table = self._find_matching_table(code_entity.name, metadata.tables)
+                matched_table = table_matches[code_entity.name]
                 
                 if entity_name in entity_map:
                     # Enhance existing insight
@@ -131,101 +268,87 @@ class UnstructuredAnalyzer:
                     if InsightSource.CODE not in insight.sources:
                         insight.sources.append(InsightSource.CODE)
                     insight.description_from_code = code_entity.description
-                    if code_entity.relationships:
-                        insight.related_entities.extend(
-                            self._normalize_name(r) for r in code_entity.relationships
-                        )
                 else:
                     # Create new insight from code
-                    insight = EntityInsight(
+                    insight = EntityInsight.model_construct(
                         entity_name=entity_name,
                         table_name=matched_table.name if matched_table else None,
                         sources=[InsightSource.CODE],
                         description_from_code=code_entity.description,
-                        related_entities=[self._normalize_name(r) for r in code_entity.relationships],
                         confidence=0.8 if matched_table else 0.6
                     )
                     entity_map[entity_name] = insight
+                
+                related_sets[entity_name].update(
+                    self._normalize_name(r) for r in code_entity.relationships
+                )
         
         # Integrate log insights
         if log_insights:
-            # Get entity statistics from logs
-            entity_stats = defaultdict(lambda: {
-                "operations": set(),
-                "related": set()
-            })
-            
-            # Collect operations
-            for pattern in log_insights.operation_patterns:
-                for entity in pattern.entities_involved:
-                    entity_stats[entity]["operations"].add(pattern.operation_type)
-            
-            # Collect cooccurrences
-            for entity, related_list in log_insights.entity_cooccurrences.items():
-                entity_stats[entity]["related"].update(related_list)
-            
             # Update insights
-            for entity, stats in entity_stats.items():
+            for entity, operations, related in zip(entity_ids, entity_operations, entity_related):
                 entity_name = self._normalize_name(entity)
                 
                 # Try to match with existing table
-                matched_table = self._find_matching_table(entity, metadata.tables)
+                matched_table = table_matches[entity]
                 
                 if entity_name in entity_map:
                     # Enhance existing insight
                     insight = entity_map[entity_name]
                     if InsightSource.LOG not in insight.sources:
                         insight.sources.append(InsightSource.LOG)
-                    insight.operations_from_logs = list(stats["operations"])
-                    insight.related_entities.extend(
-                        self._normalize_name(r) for r in stats["related"]
-                    )
+                    insight.operations_from_logs = list(operations)
                 else:
                     # Create new insight from logs
-                    insight = EntityInsight(
+                    insight = EntityInsight.model_construct(
                         entity_name=entity_name,
                         table_name=matched_table.name if matched_table else None,
                         sources=[InsightSource.LOG],
-                        operations_from_logs=list(stats["operations"]),
-                        related_entities=[self._normalize_name(r) for r in stats["related"]],
+                        operations_from_logs=list(operations),
                         confidence=0.7 if matched_table else 0.5
                     )
                     entity_map[entity_name] = insight
+                
+                related_sets[entity_name].update(related)
         
-        # Deduplicate related entities
-        for insight in entity_map.values():
-            insight.related_entities = list(set(insight.related_entities))
+        # Materialize deduplicated related entities
+        for entity_name, insight in entity_map.items():
+            insight.related_entities = list(related_sets[entity_name])
         
         return list(entity_map.values())
 
     def _generate_relationship_insights(
         self,
         metadata: DatabaseMetadata,
-        log_insights: Optional[LogInsight],
         code_insights: Optional[CodeInsight],
+        log_pairs: dict[str, list[str]],
     ) -> list[RelationshipInsight]:
         """Generate combined relationship insights from all sources.
         
         Args:
             metadata: Database metadata
-            log_insights: Insights from logs
             code_insights: Insights from code
+            log_pairs: Cooccurrence evidence per normalized (source, target) pair key
             
         Returns:
             List of RelationshipInsight objects
         """
         insights = []
         
-        # Track: (source, target) -> RelationshipInsight
+        # Track: pair key of (source, target) -> slot in insights
         relationship_map = {}
         
+        # Slot of every insight that earns a code / log confidence boost
+        code_boost_slots = []
+        log_boost_slots = []
+        
         # Add relationships from database metadata (foreign keys)
         for rel in metadata.detected_relationships:
             source = self._normalize_name(rel.source_table)
             target = self._normalize_name(rel.target_table)
-            key = (source, target)
+            key = _pair_key(source, target)
             
-            insight = RelationshipInsight(
+            insight = RelationshipInsight.model_construct(
                 source_entity=source,
                 target_entity=target,
                 relationship_type=rel.detection_method,
@@ -233,7 +356,11 @@ class UnstructuredAnalyzer:
                 evidence=[rel.reason],
                 confidence=self._confidence_to_float(rel.confidence.value)
             )
-            relationship_map[key] = insight
+            if key in relationship_map:
+                insights[relationship_map[key]] = insight
+            else:
+                relationship_map[key] = len(insights)
+                insights.append(insight)
         
         # Add relationships from code
         if code_insights:
@@ -242,62 +369,70 @@ class UnstructuredAnalyzer:
                 
                 for related in related_list:
                     target = self._normalize_name(related)
-                    key = (source, target)
+                    key = _pair_key(source, target)
                     
                     evidence = f"在代码中检测到 {entity_name} 引用 {related}"
                     
                     if key in relationship_map:
                         # Enhance existing relationship
-                        insight = relationship_map[key]
+                        slot = relationship_map[key]
+                        insight = insights[slot]
                         if InsightSource.CODE not in insight.sources:
                             insight.sources.append(InsightSource.CODE)
                         insight.evidence.append(evidence)
                         # Increase confidence
-                        insight.confidence = min(1.0, insight.confidence + 0.1)
+                        code_boost_slots.append(slot)
                     else:
                         # Create new relationship from code
-                        insight = RelationshipInsight(
+                        relationship_map[key] = len(insights)
+                        insights.append(RelationshipInsight.model_construct(
                             source_entity=source,
                             target_entity=target,
                             relationship_type="code_reference",
                             sources=[InsightSource.CODE],
                             evidence=[evidence],
                             confidence=0.7
-                        )
-                        relationship_map[key] = insight
+                        ))
         
         # Add relationships from logs (cooccurrences)
-        if log_insights:
-            for entity, related_list in log_insights.entity_cooccurrences.items():
-                source = self._normalize_name(entity)
-                
-                for related in related_list:
-                    target = self._normalize_name(related)
-                    key = (source, target)
-                    
-                    evidence = f"在日志中经常同时出现 {entity} 和 {related}"
-                    
-                    if key in relationship_map:
-                        # Enhance existing relationship
-                        insight = relationship_map[key]
-                        if InsightSource.LOG not in insight.sources:
-                            insight.sources.append(InsightSource.LOG)
-                        insight.evidence.append(evidence)
-                        # Slight confidence boost
-                        insight.confidence = min(1.0, insight.confidence + 0.05)
-                    else:
-                        # Create new relationship from logs
-                        insight = RelationshipInsight(
-                            source_entity=source,
-                            target_entity=target,
-                            relationship_type="log_cooccurrence",
-                            sources=[InsightSource.LOG],
-                            evidence=[evidence],
-                            confidence=0.5
-                        )
-                        relationship_map[key] = insight
+        for key, evidence_list in log_pairs.items():
+            if key in relationship_map:
+                # Enhance existing relationship
+                slot = relationship_map[key]
+                insight = insights[slot]
+                if InsightSource.LOG not in insight.sources:
+                    insight.sources.append(InsightSource.LOG)
+                insight.evidence.extend(evidence_list)
+                boosts = len(evidence_list)
+            else:
+                # Create new relationship from logs
+                source, _, target = key.partition("\0")
+                slot = relationship_map[key] = len(insights)
+                insights.append(RelationshipInsight.model_construct(
+                    source_entity=source,
+                    target_entity=target,
+                    relationship_type="log_cooccurrence",
+                    sources=[InsightSource.LOG],
+                    evidence=list(evidence_list),
+                    confidence=0.5
+                ))
+                boosts = len(evidence_list) - 1
+            
+            # Slight confidence boost
+            log_boost_slots.extend([slot] * boosts)
+        
+        # Apply all boosts at once; every boost is positive, so clipping the
+        # sum equals clipping after each step
+        if code_boost_slots or log_boost_slots:
+            count = len(insights)
+            confidences = np.fromiter((insight.confidence for insight in insights), dtype=float, count=count)
+            confidences += 0.1 * np.bincount(code_boost_slots, minlength=count)
+            confidences += 0.05 * np.bincount(log_boost_slots, minlength=count)
+            np.minimum(confidences, 1.0, out=confidences)
+            for insight, confidence in zip(insights, confidences.tolist()):
+                insight.confidence = confidence
         
-        return list(relationship_map.values())
+        return insights
 
     def _normalize_name(self, name: str) -> str:
         """Normalize entity name for comparison.
@@ -308,58 +443,62 @@ class UnstructuredAnalyzer:
         Returns:
             Normalized name
         """
-        # Convert to lowercase and remove common suffixes
-        normalized = name.lower()
-        suffixes = ["entity", "model", "table", "dto", "s"]
-        
-        for suffix in suffixes:
-            if normalized.endswith(suffix) and len(normalized) > len(suffix):
-                # Only remove if it's a clear suffix (preceded by underscore or different case)
-                if suffix == "s":
-                    # Handle plural
-                    normalized = normalized.rstrip("s")
-                elif normalized.endswith("_" + suffix):
-                    normalized = normalized[:-len(suffix)-1]
-        
-        return normalized.strip("_")
+        return _normalize_name(name)
 
-    def _find_matching_table(self, entity_name: str, tables: list) -> Optional:
-        """Find a database table matching the entity name.
+    def _match_tables(self, entity_names: list[str], norm_tables: list) -> dict:
+        """Match many entity names against tables with one similarity matrix.
         
         Args:
-            entity_name: Entity name from code or logs
-            tables: List of TableInfo objects
+            entity_names: Entity names from code or logs
+            norm_tables: List of (normalized name, TableInfo) pairs
             
         Returns:
-            Matching TableInfo or None
+            Dict mapping each entity name to its best matching TableInfo or None
         """
-        normalized_entity = self._normalize_name(entity_name)
+        unique_names = list(dict.fromkeys(entity_names))
+        if not unique_names or not norm_tables:
+            return {name: None for name in unique_names}
         
-        for table in tables:
-            normalized_table = self._normalize_name(table.name)
-            
-            # Exact match
-            if normalized_entity == normalized_table:
-                return table
-            
-            # Similarity match
-            similarity = self._calculate_similarity(normalized_entity, normalized_table)
-            if similarity >= self.similarity_threshold:
-                return table
+        threshold = self.similarity_threshold
+        cutoff = threshold * 100
         
-        return None
-
-    def _calculate_similarity(self, name1: str, name2: str) -> float:
-        """Calculate similarity between two names.
+        # Tables ordered by normalized name length (stable, so equal lengths keep table order)
+        order = sorted(range(len(norm_tables)), key=lambda i: len(norm_tables[i][0]))
+        table_names = [norm_tables[i][0] for i in order]
+        table_lens = [len(name) for name in table_names]
         
-        Args:
-            name1: First name
-            name2: Second name
+        # Entities grouped by normalized name length
+        by_length = defaultdict(list)
+        for name in unique_names:
+            normalized = self._normalize_name(name)
+            by_length[len(normalized)].append((name, normalized))
+        
+        matches = {}
+        for length, group in by_length.items():
+            # The ratio is at most 2*min(len)/(len_a+len_b), so only tables inside
+            # this length window can reach the threshold
+            if 0 < threshold < 2:
+                lo = bisect_left(table_lens, length * threshold / (2 - threshold) - 1e-9)
+                hi = bisect_right(table_lens, length * (2 - threshold) / threshold + 1e-9)
+            else:
+                lo, hi = 0, len(table_lens)
             
-        Returns:
-            Similarity score 0-1
-        """
-        return SequenceMatcher(None, name1, name2).ratio()
+            if lo >= hi:
+                matches.update((name, None) for name, _ in group)
+                continue
+            
+            scores = process.cdist(
+                [normalized for _, normalized in group],
+                table_names[lo:hi],
+                scorer=fuzz.ratio,
+                score_cutoff=cutoff,
+                workers=-1,
+            )
+            best = _best_matches(scores, cutoff, np.asarray(order[lo:hi]))
+            for (name, _), index in zip(group, best.tolist()):
+                matches[name] = norm_tables[index][1] if index >= 0 else None
+        
+        return {name: matches[name] for name in unique_names}
 
     def _confidence_to_float(self, confidence_str: str) -> float:
         """Convert confidence string to float.
@@ -370,12 +509,7 @@ class UnstructuredAnalyzer:
         Returns:
             Float value
         """
-        mapping = {
-            "high": 1.0,
-            "medium": 0.8,
-            "low": 0.6
-        }
-        return mapping.get(confidence_str.lower(), 0.5)
+        return _CONFIDENCE_MAP.get(confidence_str.lower(), 0.5)
 
 
 def analyze_unstructured(
@@ -0,0 +1,147 @@
+"""Shared pytest fixtures."""
+
+import hashlib
+import inspect
+import os
+import pickle
+from bisect import bisect_right
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+# Bump when the models behind the pickled sample metadata change shape
+_FIXTURE_VERSION = 1
+
+# Source of the pickled models; its hash is part of the cache key
+_MODELS_SOURCE = Path(__file__).parent.parent / "src" / "models" / "metadata.py"
+
+# (table, ((column, data_type, is_primary_key), ...), ((constraint, column, ref_table, ref_column), ...))
+_SAMPLE_SPEC = (
+    ("users", (("id", "integer", True), ("name", "varchar", False)), ()),
+    (
+        "orders",
+        (("id", "integer", True), ("user_id", "integer", False), ("amount", "numeric", False)),
+        (("fk_orders_user", "user_id", "users", "id"),),
+    ),
+    ("products", (("id", "integer", True), ("category_id", "integer", False)), ()),
+    ("categories", (("id", "integer", True), ("name", "varchar", False)), ()),
+)
+
+
+def _build_metadata(spec):
+    """Build DatabaseMetadata from a compact spec, skipping validation of known-good data."""
+    # Imported here so collection-only runs never load the models
+    from src.models.metadata import ColumnInfo, DatabaseMetadata, ForeignKeyInfo, TableInfo
+    
+    tables = []
+    for table_name, columns, foreign_keys in spec:
+        # Columns and primary keys come out of the same walk over the column spec
+        column_infos = []
+        primary_keys = []
+        for name, data_type, is_pk in columns:
+            column_infos.append(
+                ColumnInfo.model_construct(name=name, data_type=data_type, is_primary_key=is_pk)
+            )
+            if is_pk:
+                primary_keys.append(name)
+        
+        tables.append(TableInfo.model_construct(
+            name=table_name,
+            columns=column_infos,
+            primary_keys=primary_keys,
+            foreign_keys=[
+                ForeignKeyInfo.model_construct(
+                    constraint_name=constraint_name,
+                    column=column,
+                    references_table=references_table,
+                    references_column=references_column,
+                )
+                for constraint_name, column, references_table, references_column in foreign_keys
+            ],
+        ))
+    return DatabaseMetadata.model_construct(database_name="testdb", tables=tables)
+
+
+def _high_confidence_prefix(relationships):
+    """Get the leading HIGH confidence relationships of an analyze() result.
+    
+    RelationshipAnalyzer.analyze() sorts by descending confidence, so the
+    HIGH block is a prefix found by bisection.
+    """
+    from src.models.metadata import RelationshipConfidence
+    
+    end = bisect_right(
+        relationships, -RelationshipConfidence.HIGH.bit, key=lambda r: -r.confidence.bit
+    )
+    return relationships[:end]
+
+
+@pytest.fixture(scope="session")
+def sample_metadata(request):
+    """Create sample metadata for testing, pickled in the pytest cache across runs."""
+    cache = getattr(request.config, "cache", None)
+    if cache is None:
+        # Cache provider disabled (-p no:cacheprovider)
+        return _build_metadata(_SAMPLE_SPEC)
+    
+    import pydantic
+    
+    # Anything that changes how the pickle was built or loads invalidates it
+    key = hashlib.sha256(repr((_FIXTURE_VERSION, _SAMPLE_SPEC, pydantic.VERSION)).encode())
+    key.update(inspect.getsource(_build_metadata).encode())
+    key.update(_MODELS_SOURCE.read_bytes())
+    digest = key.hexdigest()[:16]
+    path = cache.mkdir("sample_metadata") / f"{digest}.pkl"
+    if path.exists():
+        try:
+            return pickle.loads(path.read_bytes())
+        except Exception:
+            # Truncated or incompatible file: rebuild and overwrite it below
+            pass
+    
+    metadata = _build_metadata(_SAMPLE_SPEC)
+    # Write then rename so parallel workers never read a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(pickle.dumps(metadata))
+    os.replace(tmp_path, path)
+    return metadata
+
+
+@pytest.fixture(scope="session")
+def analyzed(sample_metadata):
+    """Analyze the sample metadata once and share the outcome across the test session."""
+    # Imported here so collection-only runs never load networkx
+    from src.relationship_analyzer import RelationshipAnalyzer
+    
+    analyzer = RelationshipAnalyzer()
+    # analyze() fills in detected_relationships; keep the shared fixture pristine
+    result = analyzer.analyze(sample_metadata.model_copy(deep=True))
+    
+    # Prewarm the join path cache for the pairs the checks query
+    analyzer.get_join_path("orders", "users")
+    
+    # Bucket relationships by confidence in a single pass
+    by_confidence = defaultdict(list)
+    for rel in result.detected_relationships:
+        by_confidence[rel.confidence].append(rel)
+    
+    # Column-wise view of the relationships for vectorized filtering
+    import numpy as np
+    
+    rels = result.detected_relationships
+    columns = SimpleNamespace(
+        confidence=np.array([rel.confidence.value for rel in rels]),
+        source_table=np.array([rel.source_table for rel in rels], dtype=object),
+        target_table=np.array([rel.target_table for rel in rels], dtype=object),
+    )
+    
+    return SimpleNamespace(
+        analyzer=analyzer,
+        result=result,
+        by_confidence=by_confidence,
+        columns=columns,
+        high_confidence=_high_confidence_prefix(result.detected_relationships),
+    )
@@ -1,6 +1,7 @@
 """Unit tests for metadata models."""
 
 import pytest
+from pydantic import ValidationError
 from src.models.metadata import (
     ColumnInfo,
     ForeignKeyInfo,
@@ -112,3 +113,24 @@ class TestDetectedRelationship:
         assert rel.source_table == "orders"
         assert rel.target_table == "users"
         assert rel.confidence == RelationshipConfidence.HIGH
+    
+    def test_relationship_is_frozen(self):
+        rel = DetectedRelationship(
+            source_table="orders",
+            source_column="User_ID",
+            target_table="users",
+            target_column="id",
+            confidence=RelationshipConfidence.MEDIUM,
+            detection_method="naming_convention",
+            reason="Column name pattern",
+        )
+        assert rel.source_column_cf == "user_id"
+        with pytest.raises(ValidationError):
+            rel.source_column = "buyer_id"
+        
+        # The cached casefold stays out of dumps and equality
+        assert "source_column_cf" not in rel.model_dump()
+        assert rel == rel.model_copy()
+        
+        # Copies with new field values recompute it
+        assert rel.model_copy(update={"source_column": "Buyer_ID"}).source_column_cf == "buyer_id"
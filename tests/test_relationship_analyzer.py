@@ -1,112 +1,176 @@
 """Unit tests for relationship analyzer."""
 
 import pytest
-from src.relationship_analyzer import RelationshipAnalyzer
-from src.models.metadata import (
-    ColumnInfo,
-    ForeignKeyInfo,
-    TableInfo,
-    DatabaseMetadata,
-    RelationshipConfidence,
-)
+from src.models.metadata import DetectedRelationship, RelationshipConfidence
+
+
+# Enum members bound once for the checks below
+_HIGH = RelationshipConfidence.HIGH
+_MEDIUM = RelationshipConfidence.MEDIUM
+
+
+def _analyzer():
+    """Create an analyzer, importing networkx only when a test runs."""
+    from src.relationship_analyzer import RelationshipAnalyzer
+    return RelationshipAnalyzer()
+
+
+def _check_fk_relationships(analyzed):
+    """Test extraction of foreign key relationships."""
+    # Should find exactly one FK relationship
+    fk_rels = iter(analyzed.high_confidence)
+    fk_rel = next(fk_rels)
+    assert next(fk_rels, None) is None
+    
+    assert fk_rel.source_table == "orders"
+    assert fk_rel.source_column == "user_id"
+    assert fk_rel.target_table == "users"
+    assert fk_rel.target_column == "id"
+
+
+def _check_naming_relationships(analyzed):
+    """Test detection of relationships by naming convention."""
+    # Should detect category_id -> categories relationship
+    naming_rels = analyzed.by_confidence[_MEDIUM]
+    
+    # products.category_id should be detected as potential FK to categories
+    assert any(r.source_table == "products" and "category" in r.source_column_cf
+               for r in naming_rels)
+
+
+def _check_join_path(analyzed):
+    """Test finding join path between tables."""
+    path = analyzed.analyzer.get_join_path("orders", "users")
+    assert path == (("orders", "user_id", "users", "id"),)
+
+
+def _check_confidence_blocks(analyzed):
+    """Test that each confidence level forms one contiguous block, HIGH first."""
+    columns = analyzed.columns
+    total = 0
+    previous_end = 0
+    for level in RelationshipConfidence:
+        mask = columns.confidence == level.value
+        count = int(mask.sum())
+        assert count == len(analyzed.by_confidence[level])
+        assert set(columns.source_table[mask]) == {r.source_table for r in analyzed.by_confidence[level]}
+        
+        if count:
+            # Sorted by descending confidence, so each level directly follows the one above
+            positions = mask.nonzero()[0]
+            assert positions[0] == previous_end
+            assert positions[-1] - positions[0] + 1 == count
+            previous_end = positions[-1] + 1
+        total += count
+    
+    assert total == len(columns.confidence)
+
+
+def _check_relationship_stats(analyzed):
+    """Test relationship statistics."""
+    stats = analyzed.analyzer.get_relationship_stats()
+    assert stats["total_tables"] > 0
+    assert stats["total_relationships"] > 0
 
 
 class TestRelationshipAnalyzer:
     """Tests for RelationshipAnalyzer."""
     
-    @pytest.fixture
-    def sample_metadata(self):
-        """Create sample metadata for testing."""
-        return DatabaseMetadata(
-            database_name="testdb",
-            tables=[
-                TableInfo(
-                    name="users",
-                    columns=[
-                        ColumnInfo(name="id", data_type="integer", is_primary_key=True),
-                        ColumnInfo(name="name", data_type="varchar"),
-                    ],
-                    primary_keys=["id"],
-                ),
-                TableInfo(
-                    name="orders",
-                    columns=[
-                        ColumnInfo(name="id", data_type="integer", is_primary_key=True),
-                        ColumnInfo(name="user_id", data_type="integer"),
-                        ColumnInfo(name="amount", data_type="numeric"),
-                    ],
-                    primary_keys=["id"],
-                    foreign_keys=[
-                        ForeignKeyInfo(
-                            constraint_name="fk_orders_user",
-                            column="user_id",
-                            references_table="users",
-                            references_column="id",
-                        ),
-                    ],
-                ),
-                TableInfo(
-                    name="products",
-                    columns=[
-                        ColumnInfo(name="id", data_type="integer", is_primary_key=True),
-                        ColumnInfo(name="category_id", data_type="integer"),
-                    ],
-                    primary_keys=["id"],
-                ),
-                TableInfo(
-                    name="categories",
-                    columns=[
-                        ColumnInfo(name="id", data_type="integer", is_primary_key=True),
-                        ColumnInfo(name="name", data_type="varchar"),
-                    ],
-                    primary_keys=["id"],
-                ),
-            ],
+    @pytest.mark.parametrize("check", [
+        pytest.param(_check_fk_relationships, id="fk_extract"),
+        pytest.param(_check_naming_relationships, id="naming_detect"),
+        pytest.param(_check_join_path, id="join_path"),
+        pytest.param(_check_confidence_blocks, id="confidence_blocks"),
+        pytest.param(_check_relationship_stats, id="relationship_stats"),
+    ])
+    def test_analyzer_behaviors(self, analyzed, check):
+        """Run each behavior check against the shared analysis."""
+        check(analyzed)
+
+
+def _fk(source_table, source_column, target_table, target_column="id"):
+    """Build a HIGH confidence relationship for graph tests."""
+    return DetectedRelationship(
+        source_table=source_table,
+        source_column=source_column,
+        target_table=target_table,
+        target_column=target_column,
+        confidence=_HIGH,
+        detection_method="foreign_key",
+        reason="test",
+    )
+
+
+@pytest.fixture
+def chain_analyzer():
+    """Analyzer over order_items -> orders -> users and products -> categories."""
+    analyzer = _analyzer()
+    analyzer._build_relationship_graph([
+        _fk("order_items", "order_id", "orders"),
+        _fk("orders", "user_id", "users"),
+        _fk("products", "category_id", "categories"),
+    ])
+    return analyzer
+
+
+class TestJoinPath:
+    """Tests for join path search over the relationship graph."""
+    
+    def test_multi_hop(self, chain_analyzer):
+        path = chain_analyzer.get_join_path("order_items", "users")
+        assert path == (
+            ("order_items", "order_id", "orders", "id"),
+            ("orders", "user_id", "users", "id"),
         )
     
-    def test_extract_fk_relationships(self, sample_metadata):
-        """Test extraction of foreign key relationships."""
-        analyzer = RelationshipAnalyzer()
-        result = analyzer.analyze(sample_metadata)
-        
-        # Should find the FK relationship
-        fk_rels = [r for r in result.detected_relationships 
-                   if r.confidence == RelationshipConfidence.HIGH]
-        
-        assert len(fk_rels) == 1
-        assert fk_rels[0].source_table == "orders"
-        assert fk_rels[0].target_table == "users"
+    def test_no_path(self, chain_analyzer):
+        assert chain_analyzer.get_join_path("order_items", "categories") is None
+        # Joins follow FK direction only
+        assert chain_analyzer.get_join_path("users", "orders") is None
     
-    def test_detect_naming_relationships(self, sample_metadata):
-        """Test detection of relationships by naming convention."""
-        analyzer = RelationshipAnalyzer()
-        result = analyzer.analyze(sample_metadata)
-        
-        # Should detect category_id -> categories relationship
-        naming_rels = [r for r in result.detected_relationships 
-                       if r.confidence == RelationshipConfidence.MEDIUM]
-        
-        # products.category_id should be detected as potential FK to categories
-        category_rel = [r for r in naming_rels 
-                        if r.source_table == "products" and "category" in r.source_column.lower()]
-        assert len(category_rel) >= 1
+    def test_same_table(self, chain_analyzer):
+        assert chain_analyzer.get_join_path("orders", "orders") is None
     
-    def test_get_join_path(self, sample_metadata):
-        """Test finding join path between tables."""
-        analyzer = RelationshipAnalyzer()
-        analyzer.analyze(sample_metadata)
+    def test_unknown_table(self, chain_analyzer):
+        import networkx as nx
         
-        path = analyzer.get_join_path("orders", "users")
-        assert path is not None
-        assert len(path) == 1
-        assert path[0][0] == "orders"
-        assert path[0][2] == "users"
+        with pytest.raises(nx.NodeNotFound):
+            chain_analyzer.get_join_path("orders", "missing")
+        with pytest.raises(nx.NodeNotFound):
+            chain_analyzer.get_join_path("missing", "orders")
     
-    def test_get_relationship_stats(self, sample_metadata):
-        """Test relationship statistics."""
-        analyzer = RelationshipAnalyzer()
-        analyzer.analyze(sample_metadata)
-        
-        stats = analyzer.get_relationship_stats()
-        assert stats["total_tables"] > 0
-        assert stats["total_relationships"] > 0
+    def test_shortest_path_wins(self, chain_analyzer):
+        chain_analyzer._build_relationship_graph([
+            _fk("order_items", "order_id", "orders"),
+            _fk("orders", "user_id", "users"),
+            _fk("order_items", "buyer_id", "users"),
+        ])
+        assert chain_analyzer.get_join_path("order_items", "users") == (
+            ("order_items", "buyer_id", "users", "id"),
+        )
+
+
+class TestTableNameInference:
+    """Tests for inferring referenced table names from FK column names."""
+    
+    @pytest.mark.parametrize("column_name, table_name", [
+        ("user_id", "users"),
+        ("company_id", "companies"),
+        ("category_id", "categories"),
+        ("key_id", "keys"),
+        ("day_id", "days"),
+        ("status_id", "status"),
+        ("parentCompanyId", "parent_companies"),
+    ])
+    def test_extract_table_name_from_column(self, column_name, table_name):
+        """FK column stems are pluralized to their table names."""
+        assert _analyzer()._extract_table_name_from_column(column_name) == table_name
+    
+    @pytest.mark.parametrize("name, table_name", [
+        ("company", "companies"),
+        ("key", "keys"),
+        ("y", "ys"),
+    ])
+    def test_normalize_table_name(self, name, table_name):
+        """Only consonant+y stems take the -ies plural."""
+        assert _analyzer()._normalize_table_name(name) == table_name
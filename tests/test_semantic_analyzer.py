@@ -0,0 +1,329 @@
+"""Unit tests for semantic analyzer."""
+
+import asyncio
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import format_datetime
+
+import aiohttp
+import numpy as np
+import pytest
+import src.semantic_analyzer as semantic_analyzer
+from src.semantic_analyzer import (
+    DEFAULT_TABLE_ANALYSIS_PROMPT,
+    LLMConfig,
+    SemanticAnalyzer,
+    _TABLE_ANALYSIS_PERSONA,
+    _compile_template,
+    _dumps_sample,
+    _render_template,
+    _retry_delay,
+    _split_template,
+)
+
+
+_COLUMNS = [
+    {"name": "id", "data_type": "integer", "is_primary_key": True},
+    {"name": "user_id", "data_type": "integer", "comment": "下单用户"},
+]
+
+
+def _messages(template, **kwargs):
+    """Build table analysis messages for the sample columns with a given template."""
+    analyzer = SemanticAnalyzer(LLMConfig(api_key="", table_analysis_prompt=template))
+    return analyzer._build_table_messages("t_order", _COLUMNS, **kwargs)
+
+
+class TestTableMessages:
+    """Tests for splitting the table prompt into system and user messages."""
+    
+    def test_default_template(self):
+        messages = _messages(
+            DEFAULT_TABLE_ANALYSIS_PROMPT,
+            sample_data=[{"id": 1, "user_id": 2}],
+            table_comment="订单表",
+            row_count=100,
+        )
+        
+        intro = DEFAULT_TABLE_ANALYSIS_PROMPT.split("\n\n", 1)[0]
+        instructions = DEFAULT_TABLE_ANALYSIS_PROMPT[DEFAULT_TABLE_ANALYSIS_PROMPT.index("## 请分析并给出"):]
+        instructions = instructions.replace("{{", "{").replace("}}", "}")
+        assert messages == [
+            {"role": "system", "content": f"{_TABLE_ANALYSIS_PERSONA}\n\n{intro}\n\n{instructions}"},
+            {"role": "user", "content": (
+                "## 表信息\n"
+                "- 表名: t_order\n"
+                "- 表注释: 订单表\n"
+                "- 列数: 2\n"
+                "- 预估行数: 100\n"
+                "\n"
+                "## 列信息\n"
+                "- id (integer) - PK\n"
+                "- user_id (integer) - 下单用户\n"
+                "\n"
+                "## 数据样本\n"
+                '[{"id":1,"user_id":2}]'
+            )},
+        ]
+    
+    def test_system_prompt_is_shared_across_tables(self):
+        first = _messages(DEFAULT_TABLE_ANALYSIS_PROMPT)
+        analyzer = SemanticAnalyzer(LLMConfig(api_key=""))
+        second = analyzer._build_table_messages("users", [{"name": "email", "data_type": "varchar"}])
+        assert first[0] == second[0]
+        assert first[1] != second[1]
+    
+    def test_fields_at_top_and_bottom_fall_back(self):
+        template = "表名: {table_name}\n\n请推断业务含义。\n\n列数: {column_count}"
+        assert _split_template(template) is None
+        assert _messages(template) == [
+            {"role": "system", "content": _TABLE_ANALYSIS_PERSONA},
+            {"role": "user", "content": "表名: t_order\n\n请推断业务含义。\n\n列数: 2"},
+        ]
+    
+    def test_template_without_fields_falls_back(self):
+        assert _split_template("请推断业务含义。") is None
+    
+    def test_escaped_braces_in_static_part(self):
+        template = '请按 {{"entity_name_cn": "..."}} 返回。\n\n表名: {table_name}'
+        assert _split_template(template) == ('请按 {"entity_name_cn": "..."} 返回。', "表名: {table_name}")
+        assert _messages(template)[1] == {"role": "user", "content": "表名: t_order"}
+    
+    @pytest.mark.parametrize("template", [
+        '请返回 {"a": 1}\n\n表名: {table_name}',
+        "{\n\n表名: {table_name}",
+        "说明\n\n表名: {table_name}\n\n未知: {missing}",
+    ])
+    def test_unescaped_braces_raise_like_format(self, template):
+        fields = dict(
+            table_name="t_order", table_comment="无", column_count=2,
+            row_count="未知", columns_info="", sample_data="",
+        )
+        with pytest.raises(Exception) as expected:
+            template.format(**fields)
+        with pytest.raises(expected.type):
+            _messages(template)
+
+
+_FIELDS = dict(
+    table_name="t_order",
+    table_comment="订单表 (100% 覆盖)",
+    column_count=2,
+    row_count=12345,
+    columns_info="- id (integer) - PK",
+    sample_data='[{"rate":"5%"}]',
+)
+
+
+class TestRenderTemplate:
+    """Tests for the %-style rewrite of str.format prompt templates."""
+    
+    @pytest.mark.parametrize("template", [
+        DEFAULT_TABLE_ANALYSIS_PROMPT,
+        "完成率 100%，表名 {table_name}，%(table_name)s 与 %s 原样保留",
+        "{table_name}{column_count}",
+        "无占位符 {{}} 100%",
+    ])
+    def test_matches_str_format(self, template):
+        assert _compile_template(template) is not None
+        assert _render_template(template, _FIELDS) == template.format(**_FIELDS)
+    
+    @pytest.mark.parametrize("template", [
+        "预估行数: {row_count:,}",
+        "表名: {table_name!r}",
+        "首字母: {table_name[0]}",
+        "属性: {table_name.upper}",
+    ])
+    def test_fallback_to_str_format(self, template):
+        assert _compile_template(template) is None
+        assert _render_template(template, _FIELDS) == template.format(**_FIELDS)
+
+
+class TestRetryDelay:
+    """Tests for the backoff delay of direct aiohttp requests."""
+    
+    def test_retry_after_seconds(self):
+        assert _retry_delay(0, "3") == 3.0
+        assert _retry_delay(2, "0.25") == 0.25
+    
+    def test_retry_after_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        assert 25 <= _retry_delay(0, format_datetime(when, usegmt=True)) <= 30
+    
+    @pytest.mark.parametrize("retry_after", [None, "", "soon", "-1", "3600", "Wed, 21 Oct 2015 07:28:00 GMT"])
+    def test_unusable_retry_after_falls_back_to_backoff(self, retry_after):
+        for attempt in range(6):
+            base = min(0.5 * 2 ** attempt, 8.0)
+            assert 0.75 * base <= _retry_delay(attempt, retry_after) <= base
+
+
+class _StubResponse:
+    """Minimal aiohttp response for driving the retry loop."""
+    
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+    
+    async def json(self):
+        return {"status": self.status}
+
+
+class _StubSession:
+    """Replays scripted responses (or exceptions) for successive posts."""
+    
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+    
+    def post(self, url, json=None, headers=None):
+        self.calls += 1
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry sleeps instead of waiting."""
+    delays = []
+    
+    async def fake_sleep(delay):
+        delays.append(delay)
+    
+    monkeypatch.setattr(semantic_analyzer.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def _post(script, max_retries=3):
+    """Run _post_with_retry against a stub session; return (result or error, session)."""
+    analyzer = SemanticAnalyzer(LLMConfig(api_key="k", max_retries=max_retries))
+    session = _StubSession(script)
+    
+    async def run():
+        return await analyzer._post_with_retry(session, "http://llm/chat/completions", {}, {})
+    
+    try:
+        return asyncio.run(run()), session
+    except Exception as e:
+        return e, session
+
+
+class TestPostWithRetry:
+    """Tests for the retry loop of direct aiohttp requests."""
+    
+    def test_retries_rate_limits_and_server_errors(self, sleeps):
+        result, session = _post([
+            _StubResponse(429, {"Retry-After": "2"}),
+            _StubResponse(503),
+            _StubResponse(200),
+        ])
+        assert result == {"status": 200}
+        assert session.calls == 3
+        assert sleeps[0] == 2.0
+        assert 0.75 <= sleeps[1] <= 1.0
+    
+    def test_retries_connection_errors(self, sleeps):
+        result, session = _post([aiohttp.ClientConnectionError(), _StubResponse(200)])
+        assert result == {"status": 200}
+        assert len(sleeps) == 1
+    
+    @pytest.mark.parametrize("status", [400, 401, 404])
+    def test_client_errors_are_not_retried(self, sleeps, status):
+        result, session = _post([_StubResponse(status), _StubResponse(200)])
+        assert isinstance(result, aiohttp.ClientResponseError)
+        assert result.status == status
+        assert session.calls == 1
+        assert sleeps == []
+    
+    def test_raises_on_last_attempt(self, sleeps):
+        result, session = _post([_StubResponse(500)] * 3, max_retries=2)
+        assert isinstance(result, aiohttp.ClientResponseError)
+        assert result.status == 500
+        assert session.calls == 3
+        assert len(sleeps) == 2
+        
+        result, session = _post([aiohttp.ClientConnectionError()] * 2, max_retries=1)
+        assert isinstance(result, aiohttp.ClientConnectionError)
+        assert session.calls == 2
+
+
+class TestAiohttpSessions:
+    """Tests for per-event-loop aiohttp sessions."""
+    
+    def test_sessions_of_closed_loops_are_pruned(self):
+        analyzer = SemanticAnalyzer(LLMConfig(api_key="k", high_concurrency=True))
+        
+        async def open_session(close):
+            session = analyzer._aiohttp_session()
+            assert analyzer._aiohttp_session() is session
+            if close:
+                # Close the connector without removing the entry, as a caller
+                # that never calls aclose() would leave it
+                await session.close()
+            return session
+        
+        first = asyncio.run(open_session(close=True))
+        assert len(analyzer._sessions) == 1
+        
+        async def reopen():
+            second = analyzer._aiohttp_session()
+            assert second is not first
+            assert list(analyzer._sessions.values()) == [second]
+            await analyzer.aclose()
+            assert analyzer._sessions == {}
+        
+        asyncio.run(reopen())
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+
+
+class TestDumpsSample:
+    """Tests that the orjson and json sample serializers agree."""
+    
+    @pytest.mark.parametrize("value", [
+        datetime(2024, 1, 2, 3, 4, 5, 6),
+        datetime(2024, 1, 2, tzinfo=timezone.utc),
+        date(2024, 1, 2),
+        time(1, 2),
+        decimal.Decimal("1.50"),
+        uuid.UUID(int=5),
+        _Point(1),
+        np.int64(3),
+        np.float64(1.5),
+        np.float32(1.5),
+        0.1 + 0.2,
+        1e15,
+        1e16,
+        1.5e-7,
+        1e-5,
+        float("nan"),
+        float("inf"),
+        -float("inf"),
+        [1.0, {"nested": 1e20}],
+        2 ** 70,
+        "中文",
+        None,
+    ])
+    def test_matches_json_fallback(self, monkeypatch, value):
+        if semantic_analyzer.orjson is None:
+            pytest.skip("orjson not installed")
+        rows = [{"value": value, 1: True}]
+        fast = _dumps_sample(rows)
+        monkeypatch.setattr(semantic_analyzer, "orjson", None)
+        assert fast == _dumps_sample(rows)
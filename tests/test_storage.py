@@ -0,0 +1,86 @@
+"""Unit tests for connection storage."""
+
+import sqlite3
+
+import pytest
+from src.storage import ConnectionStorage, _V2_PREFIX, _get_cipher
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create a storage backed by a fresh database and key file."""
+    store = ConnectionStorage(str(tmp_path / "connections.db"))
+    yield store
+    store.close()
+
+
+class TestEncryption:
+    """Tests for password encryption."""
+    
+    def test_v2_round_trip(self, storage):
+        encrypted = storage._encrypt("s3cret-密码")
+        assert encrypted.startswith(_V2_PREFIX)
+        assert "s3cret" not in encrypted
+        assert storage._decrypt(encrypted) == "s3cret-密码"
+    
+    def test_v2_uses_fresh_nonce(self, storage):
+        assert storage._encrypt("secret") != storage._encrypt("secret")
+    
+    def test_legacy_fernet_row_decrypts(self, storage):
+        # Rows written before AES-GCM hold bare Fernet tokens
+        legacy = storage.cipher.encrypt(b"old-password").decode()
+        storage._conn.execute(
+            "INSERT INTO connections (id, db_type, password_encrypted) VALUES (?, ?, ?)",
+            ("legacy", "postgresql", legacy),
+        )
+        
+        assert storage.get_connection("legacy")["password"] == "old-password"
+    
+    def test_empty_password(self, storage):
+        assert storage._encrypt("") == ""
+        assert storage._decrypt("") == ""
+    
+    def test_get_cipher_reuses_key_file(self, tmp_path, storage):
+        key_path = tmp_path / ".key"
+        assert key_path.read_bytes() == storage.key
+        encrypted = storage._encrypt("secret")
+        
+        # A new process (no memoized cipher) must load the same key
+        _get_cipher.cache_clear()
+        reopened = ConnectionStorage(str(tmp_path / "connections.db"))
+        try:
+            assert reopened.key == storage.key
+            assert reopened._decrypt(encrypted) == "secret"
+        finally:
+            reopened.close()
+        
+        # Within a process the ciphers are built once per key file
+        assert _get_cipher(str(key_path)) is _get_cipher(str(key_path))
+
+
+class TestSaveConnections:
+    """Tests for batched connection saves."""
+    
+    def test_batch_saves_all_rows(self, storage):
+        ids = storage.save_connections([
+            {"id": "a", "db_type": "postgresql", "password": "pa"},
+            {"id": "b", "db_type": "mysql", "password": "pb"},
+        ])
+        
+        assert ids == ["a", "b"]
+        assert storage.get_connection("b")["password"] == "pb"
+    
+    def test_failing_row_rolls_back_batch(self, storage):
+        # db_type is NOT NULL, so the second row fails mid-batch
+        with pytest.raises(sqlite3.IntegrityError):
+            storage.save_connections([
+                {"id": "good", "db_type": "postgresql"},
+                {"id": "bad", "db_type": None},
+            ])
+        
+        assert storage._conn.in_transaction is False
+        assert storage.get_all_connections() == []
+        
+        # The connection is still usable after the rollback
+        storage.save_connection({"id": "after", "db_type": "sqlite"})
+        assert [c["id"] for c in storage.get_all_connections()] == ["after"]
@@ -0,0 +1,205 @@
+"""Unit tests for unstructured analyzer."""
+
+import random
+
+import pytest
+from rapidfuzz import fuzz
+from src.models.metadata import (
+    CodeInsight,
+    DatabaseMetadata,
+    DetectedRelationship,
+    LogInsight,
+    RelationshipConfidence,
+    TableInfo,
+)
+from src.unstructured_analyzer import UnstructuredAnalyzer
+
+
+def _match(threshold, entity_names, table_names):
+    """Run the batch matcher and return matched table names (or None) per entity."""
+    analyzer = UnstructuredAnalyzer(similarity_threshold=threshold)
+    norm_tables = [(analyzer._normalize_name(name), TableInfo(name=name)) for name in table_names]
+    matches = analyzer._match_tables(entity_names, norm_tables)
+    return {name: table.name if table else None for name, table in matches.items()}
+
+
+def _reference_match(analyzer, entity, table_names):
+    """Score every table one by one; the first best score at or above the cutoff wins."""
+    normalized = analyzer._normalize_name(entity)
+    best, best_score = None, -1.0
+    for name in table_names:
+        score = fuzz.ratio(normalized, analyzer._normalize_name(name))
+        if score >= analyzer.similarity_threshold * 100 and score > best_score:
+            best, best_score = name, score
+    return best
+
+
+class TestMatchTables:
+    """Tests for batch entity -> table matching."""
+    
+    @pytest.mark.parametrize("entity, table", [
+        ("abcdefghij", "abcdefghijklmno"),
+        ("abcdefghijklmno", "abcdefghij"),
+    ])
+    def test_length_bound_tight(self, entity, table):
+        # len 10 vs 15 caps the ratio at exactly 2*10/25 = 0.8
+        assert _match(0.8, [entity], [table]) == {entity: table}
+        assert _match(0.81, [entity], [table]) == {entity: None}
+    
+    @pytest.mark.parametrize("entity, table", [
+        # 18*0.56/1.44 computes as 7.000000000000002
+        ("a" * 7 + "z" * 11, "a" * 7),
+        # 21*1.44/0.56 computes as 53.99999999999999
+        ("a" * 21, "a" * 21 + "z" * 33),
+    ])
+    def test_length_bound_float_rounding(self, entity, table):
+        # The ratio cap 2*min/(len_a+len_b) is exactly 0.56, which rapidfuzz
+        # scores equal to the cutoff, so the window must still include the table
+        assert _match(0.56, [entity], [table]) == {entity: table}
+    
+    @pytest.mark.parametrize("tables, expected", [
+        (["abcdefxyz", "zz", "abcd"], "abcdefxyz"),
+        (["abcd", "zz", "abcdefxyz"], "abcd"),
+    ])
+    def test_tie_goes_to_first_table(self, tables, expected):
+        # Both score 80 against "abcdef" despite different lengths; "zz" sorts
+        # first by length, so the columns must map back to table order
+        assert _match(0.7, ["abcdef"], tables) == {"abcdef": expected}
+    
+    def test_no_table_in_window(self):
+        tables = ["a_very_long_table_name", "another_long_table_name"]
+        assert _match(0.7, ["ab", "xy"], tables) == {"ab": None, "xy": None}
+    
+    def test_window_skips_only_out_of_range_lengths(self):
+        tables = ["ordr", "orders_archive_history", "order"]
+        assert _match(0.7, ["order", "orderz"], tables) == {"order": "order", "orderz": "order"}
+    
+    def test_duplicates_and_empty_tables(self):
+        assert _match(0.7, ["user", "user"], ["users"]) == {"user": "users"}
+        assert _match(0.7, ["user"], []) == {"user": None}
+    
+    @pytest.mark.parametrize("threshold", [0.0, 0.5, 0.56, 0.7, 0.8, 1.0])
+    def test_batch_matches_per_entity_scan(self, threshold):
+        rng = random.Random(threshold)
+        stems = ["user", "order", "product", "category", "address", "item", "invoice", "cart"]
+        
+        def name():
+            stem = rng.choice(stems)
+            return rng.choice([stem, stem + "_item", "t_" + stem, stem[:-1], stem + "x" * rng.randint(1, 8)])
+        
+        tables = list(dict.fromkeys(name() for _ in range(12)))
+        entities = [name() for _ in range(60)]
+        
+        analyzer = UnstructuredAnalyzer(similarity_threshold=threshold)
+        expected = {entity: _reference_match(analyzer, entity, tables) for entity in entities}
+        assert _match(threshold, entities, tables) == expected
+
+
+def _reference_confidences(analyzer, metadata, code_insights, log_insights):
+    """Apply every confidence boost one step at a time, clipping after each."""
+    normalize = analyzer._normalize_name
+    confidences = {}
+    for rel in metadata.detected_relationships:
+        key = (normalize(rel.source_table), normalize(rel.target_table))
+        confidences[key] = analyzer._confidence_to_float(rel.confidence.value)
+    
+    for entity, related_list in code_insights.entity_relationships.items():
+        for related in related_list:
+            key = (normalize(entity), normalize(related))
+            if key in confidences:
+                confidences[key] = min(1.0, confidences[key] + 0.1)
+            else:
+                confidences[key] = 0.7
+    
+    log_counts = {}
+    for entity, related_list in log_insights.entity_cooccurrences.items():
+        for related in related_list:
+            key = (normalize(entity), normalize(related))
+            log_counts[key] = log_counts.get(key, 0) + 1
+    for key, count in log_counts.items():
+        if key not in confidences:
+            confidences[key] = 0.5
+            count -= 1
+        for _ in range(count):
+            confidences[key] = min(1.0, confidences[key] + 0.05)
+    
+    return confidences
+
+
+def _relationship_confidences(analyzer, metadata, code_insights, log_insights):
+    """Run the vectorized merge and key its confidences by entity pair."""
+    _, log_pairs = analyzer._collect_cooccurrences(log_insights)
+    insights = analyzer._generate_relationship_insights(metadata, code_insights, log_pairs)
+    return {(i.source_entity, i.target_entity): i.confidence for i in insights}
+
+
+def _detected(source, target, confidence):
+    """Build a detected relationship between two tables."""
+    return DetectedRelationship(
+        source_table=source,
+        source_column=f"{target}_id",
+        target_table=target,
+        target_column="id",
+        confidence=confidence,
+        detection_method="test",
+        reason="test",
+    )
+
+
+class TestRelationshipBoosts:
+    """Tests for the vectorized confidence boosts of relationship insights."""
+    
+    def test_boosts_and_clipping(self):
+        analyzer = UnstructuredAnalyzer()
+        metadata = DatabaseMetadata(
+            database_name="d",
+            detected_relationships=[_detected("orders", "users", RelationshipConfidence.MEDIUM)],
+        )
+        code = CodeInsight(entity_relationships={
+            "Order": ["User"],
+            "Cart": ["Item", "item", "ITEM"],
+        })
+        logs = LogInsight(entity_cooccurrences={
+            "order": ["user"] * 3,
+            "Cart": ["Item"],
+            "session": ["user", "User"],
+        })
+        
+        confidences = _relationship_confidences(analyzer, metadata, code, logs)
+        # 0.8 + 0.1 + 3 * 0.05 clips to exactly 1.0
+        assert confidences[("order", "user")] == 1.0
+        # 0.7 + 2 * 0.1 + 0.05
+        assert confidences[("cart", "item")] == pytest.approx(0.95)
+        # Created from the first log hit, boosted by the second
+        assert confidences[("session", "user")] == pytest.approx(0.55)
+    
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_step_by_step_min(self, seed):
+        rng = random.Random(seed)
+        names = ["user", "order", "item", "cart", "invoice", "product"]
+        
+        def pick():
+            return rng.choice(names)
+        
+        analyzer = UnstructuredAnalyzer()
+        metadata = DatabaseMetadata(
+            database_name="d",
+            detected_relationships=[
+                _detected(pick(), pick(), rng.choice(list(RelationshipConfidence)))
+                for _ in range(8)
+            ],
+        )
+        code = CodeInsight(entity_relationships={
+            name: [pick() for _ in range(rng.randint(1, 6))] for name in names
+        })
+        logs = LogInsight(entity_cooccurrences={
+            name: [pick() for _ in range(rng.randint(1, 12))] for name in names
+        })
+        
+        confidences = _relationship_confidences(analyzer, metadata, code, logs)
+        expected = _reference_confidences(analyzer, metadata, code, logs)
+        assert confidences.keys() == expected.keys()
+        for key, value in expected.items():
+            # Summing boosts may differ from repeated addition in the last ulp
+            assert confidences[key] == pytest.approx(value, abs=1e-12)
+            assert confidences[key] <= 1.0